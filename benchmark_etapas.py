@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark por etapa del notebook sobre datos sintéticos.
+
+Ejecuta las celdas de "NB Cuestionarios.ipynb" con un DataFrame de
+datos_sinteticos en lugar de la consulta a Athena, y mide el tiempo (y opcionalmente
+el pico de memoria) de cada etapa: normalización, filtro de cohorte, introducción,
+gráficos y Word, y armado final. Así las mejoras y regresiones se miden offline.
+
+Uso:
+    python benchmark_etapas.py --filas 10000 100000 1000000 --memoria --csv benchmark.csv
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, List
+
+import pandas as pd
+
+import datos_sinteticos as DS
+import ejecutor_notebook as EN
+
+# Etapa de cada sección del notebook; las secciones sin etapa son preparación (imports y funciones)
+ETAPAS_POR_SECCION = {
+    'Normalizacion': 'Normalización',
+    'Introduccion': 'Introducción',
+    'Graficos por Preguntas': 'Gráficos y Word',
+    'Final': 'Armado final',
+}
+
+
+def etapa_de(celda: Dict) -> str:
+    """Etapa del benchmark a la que pertenece la celda."""
+    if 'alumnos_completos' in celda['codigo']:
+        return 'Filtro de cohorte'
+    return ETAPAS_POR_SECCION.get(celda['seccion'], 'Preparación')
+
+
+def es_extraccion(celda: Dict) -> bool:
+    """La celda que consulta Athena se reemplaza por el DataFrame sintético."""
+    return celda['seccion'] == 'Codigo' and "boto3.client('athena'" in celda['codigo']
+
+
+def medir_escala(celdas: List[Dict], filas: int, dimensiones: List[str], memoria: bool = False,
+                 preguntas: int = 30, semilla: int = 0) -> pd.DataFrame:
+    """
+    Ejecuta el notebook sobre un dataset sintético y devuelve las mediciones por etapa.
+
+    Args:
+        celdas (List[Dict]): Celdas de ejecutor_notebook.cargar_celdas.
+        filas (int): Filas del dataset sintético.
+        dimensiones (List[str]): Columnas para los mapas de calor (lista_graficos).
+        memoria (bool): Si True, mide el pico de memoria de Python por etapa (más lento).
+        preguntas (int): Preguntas por cuestionario (cada una genera sus gráficos).
+        semilla (int): Semilla del dataset.
+
+    Returns:
+        pd.DataFrame: Columnas filas, etapa, segundos y pico_mb.
+    """
+    inicio = time.perf_counter()
+    df = DS.generar_dataset(filas, preguntas=preguntas, semilla=semilla)
+    mediciones = [{'filas': filas, 'etapa': 'Generación de datos',
+                   'segundos': time.perf_counter() - inicio, 'pico_mb': None}]
+
+    def al_avanzar(posicion, total, celda):
+        if memoria:
+            tracemalloc.reset_peak()
+
+    def al_terminar(celda, segundos):
+        pico = tracemalloc.get_traced_memory()[1] / 2 ** 20 if memoria else None
+        mediciones.append({'filas': filas, 'etapa': etapa_de(celda), 'segundos': segundos, 'pico_mb': pico})
+
+    def sobrescribir(espacio):
+        espacio['IA'] = False
+        espacio['lista_graficos'] = dimensiones
+
+    if memoria:
+        tracemalloc.start()
+
+    directorio_actual = os.getcwd()
+    with tempfile.TemporaryDirectory() as directorio:
+        os.chdir(directorio)  # El .docx del benchmark no ensucia el repositorio
+        try:
+            EN.ejecutar_celdas(celdas, espacio={'df': df}, omitir=es_extraccion, sobrescribir=sobrescribir,
+                               al_avanzar=al_avanzar, al_terminar=al_terminar)
+        finally:
+            os.chdir(directorio_actual)
+            if memoria:
+                tracemalloc.stop()
+
+    # Una fila por etapa: tiempo sumado y pico máximo de sus celdas
+    return (
+        pd.DataFrame(mediciones)
+        .groupby(['filas', 'etapa'], sort=False)
+        .agg(segundos=('segundos', 'sum'), pico_mb=('pico_mb', 'max'))
+        .reset_index()
+    )
+
+
+def main():
+    """Función principal del script."""
+    parser = argparse.ArgumentParser(description="Benchmark por etapa del notebook con datos sintéticos")
+    parser.add_argument('--filas', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--dimensiones', nargs='*', default=['educative_institution'],
+                        help="Columnas para los mapas de calor")
+    parser.add_argument('--preguntas', type=int, default=30, help="Preguntas por cuestionario")
+    parser.add_argument('--memoria', action='store_true', help="Mide el pico de memoria por etapa (más lento)")
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--csv', help="Guarda los resultados en un CSV")
+    args = parser.parse_args()
+
+    import matplotlib
+    matplotlib.use('Agg')
+    # El notebook pide 'Segoe UI Emoji'; sin esa fuente matplotlib avisa en cada gráfico
+    logging.getLogger('matplotlib.font_manager').setLevel(logging.ERROR)
+    # Con IA=False no se llama a OpenAI, pero el módulo exige la variable al importarse
+    os.environ.setdefault('OPENAI_API_KEY', 'sin-uso-en-benchmark')
+
+    celdas = EN.cargar_celdas()
+    resultados = []
+    for filas in args.filas:
+        print(f"Midiendo {filas:,} filas...")
+        resultados.append(medir_escala(celdas, filas, args.dimensiones, args.memoria, args.preguntas, args.semilla))
+
+    resultados = pd.concat(resultados, ignore_index=True)
+
+    print("\nSegundos por etapa")
+    print(resultados.pivot(index='etapa', columns='filas', values='segundos').round(2).to_string())
+    if args.memoria:
+        print("\nPico de memoria por etapa (MB)")
+        print(resultados.pivot(index='etapa', columns='filas', values='pico_mb').round(1).to_string())
+
+    if args.csv:
+        resultados.to_csv(args.csv, index=False)
+        print(f"\nResultados guardados en {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Bloqueo entre procesos para los archivos compartidos que se leen, combinan y reescriben.
+
+Los workers del servicio de reportes (y los notebooks abiertos a la vez) actualizan
+uso_modelo.csv y matches_tags_confirmados.csv en la carpeta del repositorio. Sin
+bloqueo, dos procesos que terminan juntos leen la misma versión y el último en
+escribir borra lo que agregó el otro. El bloqueo se toma sobre un archivo hermano
+'<archivo>.lock' con flock (o msvcrt en Windows), que el sistema operativo libera
+aunque el proceso muera.
+"""
+
+import os
+from contextlib import contextmanager
+from typing import Iterator
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+
+@contextmanager
+def bloqueo(ruta: str) -> Iterator[None]:
+    """
+    Bloqueo exclusivo sobre un archivo compartido; espera a que otro proceso lo libere.
+
+    Args:
+        ruta (str): Archivo a proteger (el bloqueo usa '<ruta>.lock').
+    """
+    with open(f"{ruta}.lock", 'a+b') as archivo:
+        if os.name == 'nt':
+            archivo.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(archivo.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue  # LK_LOCK se rinde tras 10 segundos; se sigue esperando
+        else:
+            fcntl.flock(archivo.fileno(), fcntl.LOCK_EX)
+
+        try:
+            yield
+        finally:
+            if os.name == 'nt':
+                archivo.seek(0)
+                msvcrt.locking(archivo.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(archivo.fileno(), fcntl.LOCK_UN)
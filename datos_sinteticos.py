@@ -0,0 +1,165 @@
+"""
+Generador de datos sintéticos con el mismo esquema que la salida CTAS de Athena.
+
+Sirve para medir offline cómo escalan la normalización, el filtro de cohorte, los
+gráficos y el armado del Word, sin depender de una consulta real. Todo se genera
+con operaciones vectorizadas de NumPy, así 5M de filas se crean en segundos.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Columnas en el mismo orden que el SELECT de la query BASE del notebook
+COLUMNAS = [
+    'moodle_user_id', 'origen', 'student_id', 'educative_institution', 'grade', 'grade_section',
+    'career', 'educational_level', 'age', 'genero', 'activos_por_proyecto',
+    'activos_por_educative_institution', 'activos_por_grade', 'project_id', 'project_name',
+    'moodle_course_id', 'room_id', 'evaluation_unique_id', 'evaluation_name', 'question_name',
+    'tag_question', 'question_id', 'question', 'answer', 'right_answer', 'tipo_test',
+]
+
+TESTS_POR_TIPO = {
+    'evs': ['cuestionario de entrada', 'cuestionario de salida'],
+    'evm': ['cuestionario de entrada', 'cuestionario medio'],
+    'mvs': ['cuestionario medio', 'cuestionario de salida'],
+}
+
+TAGS = [
+    'genero', 'etnia', 'estrato_socioeconomico', 'nivel_educativo_familia', 'interes_tecnologia',
+    'dispositivos', 'forma_conectividad', 'uso_tecnologia_dia_a_dia', 'uso_tecnologia_a_futuro',
+    'planes_futuro', 'abandonar_estudios', 'motivo_abandonar_estudios', 'programas_educativos',
+    'trabajo', 'intereses_futuro', 'fuentes_informacion', 'motivacion_familia', 'actividades_profesores',
+    'innovacion', 'analisis', 'critico', 'comunicacion', 'autogestion', 'equipo',
+]
+
+FRASES_ABIERTAS = [
+    'Quiero estudiar programación', 'Me gustaría trabajar en tecnología', 'Ayudar a mi familia',
+    'Estudiar ingeniería', 'Todavía no lo sé', 'Aprender robótica', 'Tener mi propio negocio',
+    'Ser profesor', 'Estudiar medicina', 'Trabajar y estudiar al mismo tiempo',
+]
+
+MAX_OPCIONES = 5
+
+
+def _catalogo_preguntas(preguntas: int, rng: np.random.Generator) -> pd.DataFrame:
+    """Preguntas con su tag, tipo (categórica, multiselección o abierta) y opciones."""
+    tipos = rng.choice(['categorica', 'multi', 'abierta'], size=preguntas, p=[0.6, 0.3, 0.1])
+    catalogo = pd.DataFrame({
+        'question_id': np.arange(1, preguntas + 1),
+        'tag_question': [TAGS[i % len(TAGS)] + ('' if i < len(TAGS) else f'_{i // len(TAGS)}') for i in range(preguntas)],
+        'tipo': tipos,
+        'opciones': rng.integers(3, MAX_OPCIONES + 1, size=preguntas),
+    })
+    catalogo['question_name'] = 'Pregunta ' + catalogo['question_id'].astype(str)
+    catalogo['question'] = (
+        '¿Pregunta sintética ' + catalogo['question_id'].astype(str) + ' sobre ' + catalogo['tag_question'] + '?'
+    )
+    # Respuesta correcta en una de cada cuatro preguntas, como en las de competencias
+    catalogo['right_answer'] = np.where(
+        (catalogo['tipo'] == 'categorica') & (catalogo.index % 4 == 0), '1. Opción 1', None
+    )
+    return catalogo
+
+
+def generar_dataset(filas: int = 10000, proyectos: int = 3, instituciones_por_proyecto: int = 20,
+                    preguntas: int = 30, tipo_test: str = 'evs', abandono: float = 0.15,
+                    semilla: int = 0) -> pd.DataFrame:
+    """
+    Genera un DataFrame con el esquema de la tabla CTAS del notebook.
+
+    Args:
+        filas (int): Cantidad aproximada de filas (las multiselecciones agregan algunas de más).
+        proyectos (int): Cantidad de proyectos.
+        instituciones_por_proyecto (int): Instituciones educativas por proyecto.
+        preguntas (int): Preguntas por cuestionario.
+        tipo_test (str): 'evs', 'evm' o 'mvs', igual que en "Variables a cambiar".
+        abandono (float): Fracción de estudiantes que no responde el segundo cuestionario.
+        semilla (int): Semilla para que los datos sean reproducibles.
+
+    Returns:
+        pd.DataFrame: Datos sintéticos con las columnas de COLUMNAS.
+    """
+    rng = np.random.default_rng(semilla)
+    tests = TESTS_POR_TIPO[tipo_test]
+    catalogo = _catalogo_preguntas(preguntas, rng)
+
+    # Estudiantes necesarios para llegar a las filas pedidas
+    estudiantes = max(1, int(np.ceil(filas / (preguntas * len(tests) * (1 - abandono / 2)))))
+
+    # --- Estudiantes ---
+    student_id = np.arange(1, estudiantes + 1)
+    proyecto = rng.integers(0, proyectos, size=estudiantes)
+    institucion = rng.integers(0, instituciones_por_proyecto, size=estudiantes)
+    grade = rng.integers(1, 12, size=estudiantes)
+    seccion = rng.choice(list('ABCD'), size=estudiantes)
+    df_est = pd.DataFrame({
+        'student_id': student_id,
+        'moodle_user_id': student_id + 100000,
+        'project_id': 70 + proyecto,
+        'project_name': pd.Series(proyecto).map(lambda p: f'Proyecto sintético {70 + p}').to_numpy(),
+        'educative_institution': pd.Series(proyecto * instituciones_por_proyecto + institucion).map(
+            lambda i: f'Institución {i:04d}').to_numpy(),
+        'grade': grade.astype(str),
+        'career': rng.choice(['Ciencias', 'Humanidades', 'Técnica', None], size=estudiantes),
+        'educational_level': rng.choice(['Secundaria', 'Primaria'], size=estudiantes, p=[0.8, 0.2]),
+        'age': rng.integers(10, 19, size=estudiantes),
+        'genero': rng.choice(['male', 'female', 'unspecified'], size=estudiantes, p=[0.48, 0.48, 0.04]),
+    })
+    df_est['grade_section'] = df_est['grade'] + '+' + seccion
+    df_est['room_id'] = pd.factorize(df_est['educative_institution'] + df_est['grade_section'])[0] + 1
+
+    # Inscriptos activos: algo más que los que responden, como en enrollment_enrolment
+    for cluster, columna in [('project_id', 'activos_por_proyecto'),
+                             ('educative_institution', 'activos_por_educative_institution'),
+                             ('grade', 'activos_por_grade')]:
+        claves = ['project_id'] if cluster == 'project_id' else ['project_id', cluster]
+        df_est[columna] = (df_est.groupby(claves)['student_id'].transform('size') * 1.2).round().astype('int64')
+
+    # --- Estudiante x test (con abandono en el segundo test) ---
+    idx_est = np.repeat(np.arange(estudiantes), len(tests))
+    idx_test = np.tile(np.arange(len(tests)), estudiantes)
+    responde = (idx_test == 0) | (rng.random(len(idx_test)) >= abandono)
+    idx_est, idx_test = idx_est[responde], idx_test[responde]
+
+    # --- (Estudiante x test) x pregunta ---
+    n = len(idx_est) * preguntas
+    fila_est = np.repeat(idx_est, preguntas)
+    fila_test = np.repeat(idx_test, preguntas)
+    fila_preg = np.tile(np.arange(preguntas), len(idx_est))
+
+    opciones = catalogo['opciones'].to_numpy()[fila_preg]
+    tipo = catalogo['tipo'].to_numpy()[fila_preg]
+
+    # La salida se corre hacia las primeras opciones, así hay cambios entre tests para analizar
+    u = rng.random(n) ** np.where(fila_test == 0, 1.0, 1.4)
+    opcion = (u * opciones).astype(int) + 1
+
+    answer = np.char.add(np.char.add(opcion.astype(str), '. Opción '), opcion.astype(str)).astype(object)
+
+    # Multiselección: una máscara de opciones distinta de cero, unida con ';'
+    es_multi = tipo == 'multi'
+    if es_multi.any():
+        mascaras = rng.integers(1, 2 ** opciones[es_multi])
+        textos_mascara = np.array([
+            '; '.join(f'{o}. Opción {o}' for o in range(1, MAX_OPCIONES + 1) if m & (1 << (o - 1)))
+            for m in range(2 ** MAX_OPCIONES)
+        ], dtype=object)
+        answer[es_multi] = textos_mascara[mascaras]
+
+    es_abierta = tipo == 'abierta'
+    answer[es_abierta] = np.array(FRASES_ABIERTAS, dtype=object)[rng.integers(0, len(FRASES_ABIERTAS), es_abierta.sum())]
+
+    # --- Armado final ---
+    df = df_est.iloc[fila_est].reset_index(drop=True)
+    preg = catalogo.iloc[fila_preg].reset_index(drop=True)
+    for columna in ['question_name', 'tag_question', 'question_id', 'question', 'right_answer']:
+        df[columna] = preg[columna].to_numpy()
+
+    df['answer'] = answer
+    df['tipo_test'] = np.array(tests, dtype=object)[fila_test]
+    df['origen'] = 'Moodle'
+    df['moodle_course_id'] = df['project_id'] * 10
+    df['evaluation_unique_id'] = df['project_id'] * 100 + fila_test
+    df['evaluation_name'] = df['tipo_test'].str.capitalize()
+
+    return df[COLUMNAS]
@@ -0,0 +1,98 @@
+"""
+Ejecución de las celdas de "NB Cuestionarios.ipynb" fuera de Jupyter.
+
+Permite correr el notebook desde el servicio de reportes o desde los benchmarks
+sin duplicar su código: se leen las celdas de código, se quitan los comandos
+mágicos de IPython y se ejecutan en orden sobre un mismo espacio de nombres.
+"""
+
+import json
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+RUTA_NOTEBOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'NB Cuestionarios.ipynb')
+SECCION_VARIABLES = 'Variables a cambiar'
+
+
+def cargar_celdas(ruta: str = RUTA_NOTEBOOK) -> List[Dict]:
+    """
+    Lee las celdas de código del notebook.
+
+    Args:
+        ruta (str): Ruta del notebook.
+
+    Returns:
+        List[Dict]: Una entrada por celda con indice, seccion (último título de nivel 1) y codigo.
+    """
+    with open(ruta, encoding='utf-8') as f:
+        notebook = json.load(f)
+
+    celdas = []
+    seccion = ''
+    for indice, celda in enumerate(notebook['cells']):
+        fuente = ''.join(celda['source'])
+
+        if celda['cell_type'] == 'markdown':
+            for linea in fuente.splitlines():
+                if linea.startswith('# '):
+                    seccion = linea[2:].strip()
+            continue
+
+        if celda['cell_type'] != 'code':
+            continue
+
+        # Los comandos mágicos (%matplotlib inline, !pip ...) solo existen en IPython
+        codigo = '\n'.join(
+            linea for linea in fuente.splitlines()
+            if not linea.lstrip().startswith(('%', '!'))
+        )
+        celdas.append({'indice': indice, 'seccion': seccion, 'codigo': codigo})
+
+    return celdas
+
+
+def ejecutar_celdas(celdas: List[Dict], espacio: Optional[dict] = None,
+                    omitir: Optional[Callable[[Dict], bool]] = None,
+                    sobrescribir: Optional[Callable[[dict], None]] = None,
+                    al_avanzar: Optional[Callable[[int, int, Dict], None]] = None,
+                    al_terminar: Optional[Callable[[Dict, float], None]] = None) -> dict:
+    """
+    Ejecuta las celdas en orden sobre un mismo espacio de nombres.
+
+    Args:
+        celdas (List[Dict]): Celdas devueltas por cargar_celdas.
+        espacio (dict): Espacio de nombres inicial (por ejemplo con un df ya cargado).
+        omitir (Callable): Recibe la celda y devuelve True si no se debe ejecutar.
+        sobrescribir (Callable): Se llama con el espacio de nombres al terminar la sección
+            "Variables a cambiar", para reemplazar los valores por defecto del notebook.
+        al_avanzar (Callable): Se llama con (posición, total, celda) antes de cada celda.
+        al_terminar (Callable): Se llama con (celda, segundos) después de cada celda.
+
+    Returns:
+        dict: El espacio de nombres final.
+    """
+    if espacio is None:
+        espacio = {}
+    espacio.setdefault('__name__', '__main__')
+    espacio.setdefault('display', lambda *objetos: print(*objetos))
+
+    total = len(celdas)
+    for posicion, celda in enumerate(celdas):
+        if omitir is None or not omitir(celda):
+            if al_avanzar is not None:
+                al_avanzar(posicion, total, celda)
+
+            inicio = time.perf_counter()
+            exec(compile(celda['codigo'], f"<celda {celda['indice']}>", 'exec'), espacio)
+            if al_terminar is not None:
+                al_terminar(celda, time.perf_counter() - inicio)
+
+        fin_variables = (
+            celda['seccion'] == SECCION_VARIABLES
+            and (posicion + 1 == total or celdas[posicion + 1]['seccion'] != SECCION_VARIABLES)
+        )
+        if fin_variables and sobrescribir is not None:
+            sobrescribir(espacio)
+
+    return espacio
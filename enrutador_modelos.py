@@ -0,0 +1,145 @@
+"""
+Enrutador de modelos de OpenAI según el tipo de llamada, el plazo y el costo del informe.
+
+Las llamadas por pregunta (cientos por informe) usan modelos rápidos y baratos;
+los resúmenes finales pueden usar un modelo más fuerte. El enrutador estima el
+costo de cada llamada con PRECIOS_MODELOS y su demora con la latencia observada,
+y baja de modelo (o devuelve None para usar el texto de respaldo) cuando el plazo
+o el tope de costo del informe están por agotarse.
+"""
+
+import time
+from typing import Dict, List, Optional
+
+# Candidatos por tipo de llamada, del más fuerte al más barato
+MODELOS_POR_TIPO = {
+    'pregunta': ['gpt-4.1-nano'],
+    'mapa': ['gpt-4.1-nano'],
+    'resumen': ['gpt-4.1', 'gpt-4.1-mini', 'gpt-4.1-nano'],
+}
+
+LATENCIA_INICIAL_S = 5.0   # Estimación de demora antes de observar llamadas reales
+TIMEOUT_LLAMADA_S = 60.0   # Demora máxima de una llamada aunque el plazo del informe sea mayor
+CARACTERES_POR_TOKEN = 4   # Aproximación para estimar tokens de entrada sin tokenizador
+
+
+class EnrutadorModelos:
+    """
+    Elige el modelo de cada llamada respetando un plazo y un tope de costo para todo el informe.
+
+    Args:
+        precios (dict): Precios por modelo (PRECIOS_MODELOS), en USD por millón de tokens.
+        plazo_s (float): Segundos disponibles para todo el informe. None para no limitar.
+        tope_usd (float): Costo máximo del informe en USD. None para no limitar.
+        reserva_resumen (float): Fracción del plazo y del costo reservada para las llamadas de resumen.
+        modelos_por_tipo (dict): Candidatos por tipo de llamada, del más fuerte al más barato.
+        suavizado (float): Peso de la última latencia observada en el promedio móvil (0.0-1.0).
+    """
+
+    def __init__(self, precios: Dict[str, Dict[str, float]], plazo_s: Optional[float] = None,
+                 tope_usd: Optional[float] = None, reserva_resumen: float = 0.2,
+                 modelos_por_tipo: Optional[Dict[str, List[str]]] = None, suavizado: float = 0.3):
+        self.precios = precios
+        self.plazo_s = plazo_s
+        self.tope_usd = tope_usd
+        self.reserva_resumen = reserva_resumen
+        self.modelos_por_tipo = modelos_por_tipo or MODELOS_POR_TIPO
+        self.suavizado = suavizado
+
+        for tipo, modelos in self.modelos_por_tipo.items():
+            desconocidos = [m for m in modelos if m not in precios]
+            if desconocidos:
+                raise ValueError(f"Modelos sin precio para el tipo '{tipo}': {desconocidos}")
+
+        self.inicio = time.monotonic()
+        self.costo_acumulado = 0.0
+        self.latencias = {}     # Promedio móvil de segundos por llamada, por modelo
+        self.llamadas = []      # (tipo, modelo elegido o None)
+
+    def tiempo_restante(self, tipo: str) -> float:
+        """Segundos disponibles para una llamada del tipo indicado."""
+        if self.plazo_s is None:
+            return float('inf')
+        restante = self.plazo_s - (time.monotonic() - self.inicio)
+        if tipo != 'resumen':
+            restante -= self.plazo_s * self.reserva_resumen
+        return restante
+
+    def limite_llamada(self, tipo: str) -> float:
+        """Timeout de una llamada del tipo indicado: el tiempo restante, con un máximo de TIMEOUT_LLAMADA_S."""
+        return max(0.0, min(self.tiempo_restante(tipo), TIMEOUT_LLAMADA_S))
+
+    def costo_restante(self, tipo: str) -> float:
+        """USD disponibles para una llamada del tipo indicado."""
+        if self.tope_usd is None:
+            return float('inf')
+        restante = self.tope_usd - self.costo_acumulado
+        if tipo != 'resumen':
+            restante -= self.tope_usd * self.reserva_resumen
+        return restante
+
+    def estimar_costo(self, modelo: str, prompt: str, max_tokens: int) -> float:
+        """Costo máximo esperado de la llamada (todos los tokens de salida permitidos)."""
+        precios = self.precios[modelo]
+        input_tokens = len(prompt) / CARACTERES_POR_TOKEN
+        return (input_tokens * precios['input'] + max_tokens * precios['output']) / 1000000
+
+    def estimar_latencia(self, modelo: str) -> float:
+        """Latencia observada del modelo; si aún no hay datos, la peor observada o la inicial."""
+        if modelo in self.latencias:
+            return self.latencias[modelo]
+        return max(self.latencias.values(), default=LATENCIA_INICIAL_S)
+
+    def elegir(self, tipo: str, prompt: str, max_tokens: int) -> Optional[str]:
+        """
+        Elige el modelo más fuerte del tipo que entra en el plazo y en el costo restantes.
+
+        Args:
+            tipo (str): Tipo de llamada ('pregunta', 'mapa' o 'resumen').
+            prompt (str): Prompt a enviar, para estimar los tokens de entrada.
+            max_tokens (int): Máximo de tokens en la respuesta.
+
+        Returns:
+            str: Nombre del modelo, o None si ninguno entra en el presupuesto y se debe usar el respaldo.
+        """
+        if tipo not in self.modelos_por_tipo:
+            raise ValueError(f"Tipo de llamada desconocido: '{tipo}'")
+
+        tiempo = self.tiempo_restante(tipo)
+        costo = self.costo_restante(tipo)
+
+        elegido = None
+        for modelo in self.modelos_por_tipo[tipo]:
+            if (self.estimar_latencia(modelo) <= tiempo
+                    and self.estimar_costo(modelo, prompt, max_tokens) <= costo):
+                elegido = modelo
+                break
+
+        self.llamadas.append((tipo, elegido))
+        return elegido
+
+    def registrar(self, modelo: str, latencia_s: float, costo_usd: float) -> None:
+        """Actualiza la latencia observada del modelo y el costo acumulado del informe."""
+        anterior = self.latencias.get(modelo)
+        if anterior is None:
+            self.latencias[modelo] = latencia_s
+        else:
+            self.latencias[modelo] = self.suavizado * latencia_s + (1 - self.suavizado) * anterior
+        self.costo_acumulado += costo_usd
+
+    def resumen(self) -> dict:
+        """Resumen del uso del presupuesto: llamadas por modelo, respaldos, costo y tiempo."""
+        por_modelo = {}
+        respaldos = 0
+        for _, modelo in self.llamadas:
+            if modelo is None:
+                respaldos += 1
+            else:
+                por_modelo[modelo] = por_modelo.get(modelo, 0) + 1
+
+        return {
+            'llamadas_por_modelo': por_modelo,
+            'respaldos': respaldos,
+            'costo_usd': round(self.costo_acumulado, 6),
+            'tiempo_s': round(time.monotonic() - self.inicio, 1),
+        }
@@ -0,0 +1,185 @@
+"""
+Extracción de consultas de Athena con UNLOAD a Parquet.
+
+UNLOAD escribe el resultado directamente en S3, sin crear ni borrar una tabla
+temporal en el catálogo. Los archivos Parquet se descargan en paralelo con un
+cliente de S3 con pool de conexiones, se unen en un DataFrame y todo el prefijo
+temporal (datos y metadatos de Athena) se borra al final, aunque la consulta falle.
+Si la espera se interrumpe (Ctrl+C o interrupción del kernel), la consulta se
+detiene antes de borrar, así Athena no sigue escribiendo archivos después de la limpieza.
+Los clientes se pueden inyectar, así la extracción se prueba con moto.
+"""
+
+import io
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import boto3
+import pandas as pd
+from botocore.config import Config
+
+CARPETA_TEMPORAL = 'python_ale'
+ESTADOS_FINALES = ('SUCCEEDED', 'FAILED', 'CANCELLED')
+MAX_BORRADO = 1000  # Máximo de claves por llamada a delete_objects
+PLAZO_DETENCION_S = 60  # Espera máxima a que Athena confirme que detuvo la consulta
+
+
+def esperar_consulta(athena, query_execution_id: str, intervalo: float = 2) -> dict:
+    """
+    Espera a que termine una consulta de Athena.
+
+    Args:
+        athena: Cliente de Athena.
+        query_execution_id (str): Id devuelto por start_query_execution.
+        intervalo (float): Segundos entre consultas de estado.
+
+    Returns:
+        dict: El 'QueryExecution' final.
+    """
+    while True:
+        ejecucion = athena.get_query_execution(QueryExecutionId=query_execution_id)['QueryExecution']
+        if ejecucion['Status']['State'] in ESTADOS_FINALES:
+            return ejecucion
+        time.sleep(intervalo)
+
+
+def detener_consulta(athena, query_execution_id: str, intervalo: float = 2,
+                     plazo_s: float = PLAZO_DETENCION_S) -> Optional[str]:
+    """
+    Detiene una consulta en curso y espera a que quede en un estado final.
+
+    Args:
+        athena: Cliente de Athena.
+        query_execution_id (str): Id de la consulta.
+        intervalo (float): Segundos entre consultas de estado.
+        plazo_s (float): Segundos máximos de espera.
+
+    Returns:
+        str: Estado final, o None si no se confirmó dentro del plazo.
+    """
+    athena.stop_query_execution(QueryExecutionId=query_execution_id)
+
+    limite = time.monotonic() + plazo_s
+    while True:
+        estado = athena.get_query_execution(QueryExecutionId=query_execution_id)['QueryExecution']['Status']['State']
+        if estado in ESTADOS_FINALES:
+            return estado
+        if time.monotonic() >= limite:
+            return None
+        time.sleep(intervalo)
+
+
+def listar_claves(s3, bucket: str, prefijo: str) -> List[str]:
+    """Claves bajo el prefijo, recorriendo todas las páginas de list_objects_v2."""
+    claves = []
+    for pagina in s3.get_paginator('list_objects_v2').paginate(Bucket=bucket, Prefix=prefijo):
+        claves.extend(obj['Key'] for obj in pagina.get('Contents', []))
+    return claves
+
+
+def borrar_prefijo(s3, bucket: str, prefijo: str) -> int:
+    """
+    Borra todos los objetos bajo el prefijo, en lotes de MAX_BORRADO.
+
+    Returns:
+        int: Cantidad de objetos borrados.
+    """
+    claves = listar_claves(s3, bucket, prefijo)
+    for inicio in range(0, len(claves), MAX_BORRADO):
+        lote = claves[inicio:inicio + MAX_BORRADO]
+        s3.delete_objects(Bucket=bucket, Delete={'Objects': [{'Key': k} for k in lote], 'Quiet': True})
+    return len(claves)
+
+
+def descargar_parquet(s3, bucket: str, claves: List[str], max_workers: int = 8) -> pd.DataFrame:
+    """
+    Descarga en paralelo los archivos Parquet y los une en un DataFrame.
+
+    Args:
+        s3: Cliente de S3 (los clientes de boto3 se pueden compartir entre hilos).
+        bucket (str): Bucket de los archivos.
+        claves (List[str]): Claves de los archivos Parquet.
+        max_workers (int): Descargas simultáneas.
+
+    Returns:
+        pd.DataFrame: Las partes concatenadas en el orden de las claves.
+    """
+    def leer(clave):
+        contenido = s3.get_object(Bucket=bucket, Key=clave)['Body'].read()
+        return pd.read_parquet(io.BytesIO(contenido), engine='pyarrow')
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        partes = list(pool.map(leer, claves))
+
+    if not partes:
+        return pd.DataFrame()
+    return pd.concat(partes, ignore_index=True)
+
+
+def extraer_unload(query: str, bucket: str, prefijo: Optional[str] = None, base_datos: str = 'datalake',
+                   athena=None, s3=None, region: str = 'us-east-1', max_workers: int = 8,
+                   intervalo: float = 2) -> pd.DataFrame:
+    """
+    Ejecuta la consulta con UNLOAD a Parquet y devuelve el resultado como DataFrame.
+
+    Args:
+        query (str): Consulta SELECT (puede tener WITH).
+        bucket (str): Bucket donde Athena deja los archivos temporales.
+        prefijo (str): Prefijo temporal; debe estar vacío. Por defecto uno único bajo CARPETA_TEMPORAL.
+        base_datos (str): Base de datos de Athena.
+        athena: Cliente de Athena. Si es None se crea uno en la región indicada.
+        s3: Cliente de S3. Si es None se crea uno con max_workers conexiones.
+        region (str): Región de los clientes que se crean.
+        max_workers (int): Descargas simultáneas de archivos Parquet.
+        intervalo (float): Segundos entre consultas de estado de Athena.
+
+    Returns:
+        pd.DataFrame: Resultado de la consulta.
+    """
+    athena = athena or boto3.client('athena', region_name=region)
+    s3 = s3 or boto3.client('s3', region_name=region, config=Config(max_pool_connections=max_workers))
+
+    prefijo = (prefijo or f"{CARPETA_TEMPORAL}/{int(time.time())}-{uuid.uuid4().hex[:8]}").strip('/') + '/'
+    prefijo_datos = f"{prefijo}datos/"
+
+    unload_query = f"""
+UNLOAD ({query})
+TO 's3://{bucket}/{prefijo_datos}'
+WITH (format = 'PARQUET', compression = 'SNAPPY')
+"""
+
+    query_execution_id = None
+    terminada = False
+    try:
+        respuesta = athena.start_query_execution(
+            QueryString=unload_query,
+            QueryExecutionContext={'Database': base_datos},
+            # Los metadatos y el manifiesto de Athena quedan bajo el mismo prefijo, así se borran juntos
+            ResultConfiguration={'OutputLocation': f"s3://{bucket}/{prefijo}meta/"}
+        )
+        query_execution_id = respuesta['QueryExecutionId']
+        ejecucion = esperar_consulta(athena, query_execution_id, intervalo)
+        terminada = True
+        estado = ejecucion['Status']['State']
+        if estado != 'SUCCEEDED':
+            raise RuntimeError(f"UNLOAD terminó con estado {estado}: {ejecucion['Status'].get('StateChangeReason')}")
+
+        claves = sorted(listar_claves(s3, bucket, prefijo_datos))
+        print(f"✅ UNLOAD completado: {len(claves)} archivos Parquet en s3://{bucket}/{prefijo_datos}")
+        return descargar_parquet(s3, bucket, claves, max_workers)
+
+    finally:
+        # Interrumpida durante la espera: si no se detiene, Athena seguiría escribiendo después del borrado
+        if query_execution_id is not None and not terminada:
+            try:
+                if detener_consulta(athena, query_execution_id, intervalo) is None:
+                    print(f"⚠️ Athena no confirmó la detención de {query_execution_id}; pueden quedar archivos en s3://{bucket}/{prefijo}")
+            except Exception as e:
+                print(f"⚠️ Error al detener la consulta en Athena: {str(e)}")
+        try:
+            borrados = borrar_prefijo(s3, bucket, prefijo)
+            print(f"🗑️ Se eliminaron {borrados} archivos temporales de S3")
+        except Exception as e:
+            print(f"⚠️ Error al eliminar archivos de S3: {str(e)}")
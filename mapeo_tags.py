@@ -0,0 +1,224 @@
+"""
+Mapeo de preguntas al catálogo de tags (Lista de tag.xlsx).
+
+Reemplaza el fuzzy matching pregunta por pregunta con difflib por un índice
+TF-IDF de n-gramas de caracteres que se construye una sola vez sobre la
+columna "Pregunta final" del catálogo. Todas las preguntas distintas se
+comparan en una única multiplicación de matrices dispersas (similitud coseno)
+y los matches aceptados se guardan en un CSV con su similitud real, para no
+recalcularlos en el siguiente reporte. Al cargarlos se vuelve a aplicar el
+cutoff, salvo a los que una persona confirmó a mano.
+"""
+
+import os
+from functools import lru_cache
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+import bloqueo_archivos as BA
+
+COLUMNAS_CATALOGO = ['# final', 'seccion', 'tag', 'dimension', 'Pregunta final']
+RUTA_CONFIRMADOS = 'matches_tags_confirmados.csv'
+
+
+class IndiceTags:
+    """
+    Índice de n-gramas de caracteres sobre las preguntas del catálogo de tags.
+
+    Args:
+        catalogo (pd.DataFrame): Catálogo con las columnas de COLUMNAS_CATALOGO.
+        cutoff (float): Similitud coseno mínima para aceptar un match (0.0-1.0).
+        ngramas (tuple): Rango de n-gramas de caracteres del vectorizador.
+        ruta_confirmados (str): CSV donde se persisten los matches aceptados. None para no persistir.
+            Columnas: question, question_match, similitud y manual.
+    """
+
+    def __init__(self, catalogo: pd.DataFrame, cutoff: float = 0.6, ngramas: tuple = (3, 5),
+                 ruta_confirmados: Optional[str] = RUTA_CONFIRMADOS):
+        # Una fila por "Pregunta final" para que el merge posterior no duplique respuestas
+        self.catalogo = (
+            catalogo[COLUMNAS_CATALOGO]
+            .dropna(subset=['Pregunta final'])
+            .drop_duplicates(subset=['Pregunta final'])
+            .reset_index(drop=True)
+        )
+        self.cutoff = cutoff
+        self.ruta_confirmados = ruta_confirmados
+
+        self._vectorizador = TfidfVectorizer(
+            analyzer='char_wb',
+            ngram_range=ngramas,
+            lowercase=True,
+            strip_accents='unicode',
+            sublinear_tf=True,
+        )
+        # Las filas quedan normalizadas (L2), así el producto punto es la similitud coseno
+        self._matriz_catalogo = self._vectorizador.fit_transform(self.catalogo['Pregunta final'].astype(str))
+
+        self.confirmados = self._leer_confirmados()
+
+    @classmethod
+    def desde_excel(cls, ruta_excel: str, **kwargs) -> 'IndiceTags':
+        """Construye el índice leyendo el catálogo de tags una sola vez."""
+        return cls(pd.read_excel(ruta_excel), **kwargs)
+
+    def _leer_confirmados(self) -> dict:
+        """
+        Carga los matches guardados que siguen vigentes.
+
+        Se descartan los que ya no existen en el catálogo y los automáticos cuya similitud
+        no supera el cutoff actual; los confirmados a mano se conservan siempre.
+
+        Returns:
+            dict: question -> (question_match, similitud, manual).
+        """
+        if not self.ruta_confirmados or not os.path.exists(self.ruta_confirmados):
+            return {}
+
+        # Otro proceso puede estar reescribiendo el archivo
+        with BA.bloqueo(self.ruta_confirmados):
+            return self._vigentes(self._leer_archivo())
+
+    def _leer_archivo(self) -> dict:
+        """
+        Todas las filas de ruta_confirmados, sin filtrar; quien llama debe tener el bloqueo.
+
+        Returns:
+            dict: question -> (question_match, similitud, manual).
+        """
+        if not os.path.exists(self.ruta_confirmados):
+            return {}
+
+        confirmados = pd.read_csv(self.ruta_confirmados)
+        # Archivos anteriores sin similitud: no se puede verificar el cutoff, se recalculan
+        if 'similitud' not in confirmados.columns:
+            confirmados['similitud'] = np.nan
+        if 'manual' not in confirmados.columns:
+            confirmados['manual'] = False
+        confirmados['manual'] = confirmados['manual'].fillna(False).astype(bool)
+
+        return {
+            pregunta: (match, float(similitud), bool(manual))
+            for pregunta, match, similitud, manual in zip(
+                confirmados['question'], confirmados['question_match'], confirmados['similitud'], confirmados['manual'])
+        }
+
+    def _vigentes(self, guardados: dict) -> dict:
+        """Matches que siguen en el catálogo y son manuales o superan el cutoff."""
+        catalogo = set(self.catalogo['Pregunta final'])
+        return {
+            pregunta: (match, similitud, manual)
+            for pregunta, (match, similitud, manual) in guardados.items()
+            if match in catalogo and (manual or similitud >= self.cutoff)
+        }
+
+    def match(self, preguntas: Iterable[str]) -> pd.DataFrame:
+        """
+        Busca la "Pregunta final" más parecida para cada pregunta distinta.
+
+        Args:
+            preguntas (Iterable[str]): Preguntas a mapear (pueden venir repetidas).
+
+        Returns:
+            pd.DataFrame: Columnas question, question_match y similitud. question_match
+            es None cuando ninguna pregunta del catálogo supera el cutoff.
+        """
+        preguntas = pd.Series(list(preguntas), dtype=object).dropna().astype(str).unique()
+
+        # El índice vive entre reportes (indice_desde_excel): se releen los matches que otros procesos guardaron
+        if self.ruta_confirmados:
+            self.confirmados = self._leer_confirmados()
+
+        ya_confirmadas = [p for p in preguntas if p in self.confirmados]
+        pendientes = [p for p in preguntas if p not in self.confirmados]
+
+        resultado = [
+            {'question': p, 'question_match': self.confirmados[p][0], 'similitud': self.confirmados[p][1]}
+            for p in ya_confirmadas
+        ]
+
+        if pendientes and self._matriz_catalogo.shape[0] > 0:
+            # Una sola pasada dispersa: (preguntas x ngramas) @ (ngramas x catálogo)
+            matriz_preguntas = self._vectorizador.transform(pendientes)
+            similitudes = (matriz_preguntas @ self._matriz_catalogo.T).tocsr()
+
+            mejores = np.asarray(similitudes.argmax(axis=1)).ravel()
+            puntajes = similitudes.max(axis=1).toarray().ravel()
+            candidatas = self.catalogo['Pregunta final'].to_numpy()[mejores]
+
+            for pregunta, candidata, puntaje in zip(pendientes, candidatas, puntajes):
+                resultado.append({
+                    'question': pregunta,
+                    'question_match': candidata if puntaje >= self.cutoff else None,
+                    'similitud': round(float(puntaje), 4),
+                })
+        else:
+            resultado.extend({'question': p, 'question_match': None, 'similitud': 0.0} for p in pendientes)
+
+        return pd.DataFrame(resultado, columns=['question', 'question_match', 'similitud'])
+
+    def confirmar(self, matches: pd.DataFrame, manual: bool = False) -> None:
+        """
+        Persiste los matches aceptados para que el siguiente reporte no los recalcule.
+
+        Args:
+            matches (pd.DataFrame): Salida de match (o una selección revisada de ella).
+            manual (bool): True si una persona revisó los matches; esos se conservan aunque
+                no superen el cutoff. Los automáticos guardan su similitud real y se vuelven
+                a filtrar por el cutoff al cargarse.
+        """
+        aceptados = matches.dropna(subset=['question_match'])
+
+        if not self.ruta_confirmados:
+            self._combinar(self.confirmados, aceptados, manual)
+            return
+
+        # Se relee el archivo dentro del bloqueo: otros procesos pudieron agregar matches
+        # (incluso manuales) desde que se construyó el índice, y no deben perderse
+        with BA.bloqueo(self.ruta_confirmados):
+            # Todas las filas: también las que otro proceso guardó con otro catálogo o cutoff
+            guardados = self._leer_archivo()
+            self._combinar(guardados, aceptados, manual)
+            pd.DataFrame(
+                [(p, m, sim, man) for p, (m, sim, man) in guardados.items()],
+                columns=['question', 'question_match', 'similitud', 'manual']
+            ).to_csv(self.ruta_confirmados, index=False)
+
+        self.confirmados = self._vigentes(guardados)
+
+    @staticmethod
+    def _combinar(guardados: dict, aceptados: pd.DataFrame, manual: bool) -> None:
+        """Agrega los matches aceptados a guardados; uno automático no pisa una confirmación manual."""
+        for pregunta, match, similitud in zip(aceptados['question'], aceptados['question_match'], aceptados['similitud']):
+            if not manual and guardados.get(pregunta, (None, None, False))[2]:
+                continue
+            guardados[pregunta] = (match, float(similitud), manual)
+
+    def enriquecer(self, df: pd.DataFrame, confirmar: bool = True) -> pd.DataFrame:
+        """
+        Agrega orden, seccion, tag y dimension del catálogo a cada fila del DataFrame.
+
+        Args:
+            df (pd.DataFrame): DataFrame con la columna 'question'.
+            confirmar (bool): Si True, guarda los matches automáticos con su similitud.
+
+        Returns:
+            pd.DataFrame: El DataFrame original con las columnas del catálogo.
+        """
+        matches = self.match(df['question'])
+        if confirmar:
+            self.confirmar(matches)
+
+        df_mapping = self.catalogo.rename(columns={'Pregunta final': 'question_match', '# final': 'orden'})
+        df_question = matches.merge(df_mapping, on='question_match', how='left')
+
+        return df.merge(df_question.drop(columns=['similitud']), on='question', how='left')
+
+
+@lru_cache(maxsize=4)
+def indice_desde_excel(ruta_excel: str, cutoff: float = 0.6) -> IndiceTags:
+    """Devuelve el índice del catálogo, reutilizándolo entre reportes de la misma sesión."""
+    return IndiceTags.desde_excel(ruta_excel, cutoff=cutoff)
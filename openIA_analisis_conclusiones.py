@@ -3,9 +3,11 @@ import openai
 from typing import List, Union
 import os
 from datetime import datetime
+from functools import partial
 from dotenv import load_dotenv
 import json
 import re
+import time
 
 # Cargar variables de entorno desde .env
 load_dotenv()
@@ -47,7 +49,44 @@ PRECIOS_MODELOS = {
     'gpt-image-1': {'input': 5.00, 'output': 1.25},
 }
 
-def call_gpt(prompt: str, modelo: str = "gpt-4.1-nano", max_tokens: int = 1500, temperature: float = 0.7) -> str:
+_cliente_sin_reintentos = None
+
+# Llamadas con plazo: se reintentan los errores transitorios (como el cliente por defecto) mientras quede plazo
+REINTENTOS = 2
+ESPERA_REINTENTO_S = 0.5
+ERRORES_REINTENTABLES = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
+def cliente_sin_reintentos() -> openai.OpenAI:
+    """Cliente para llamadas con plazo: sin reintentos propios, así el timeout acota la llamada completa."""
+    global _cliente_sin_reintentos
+    if _cliente_sin_reintentos is None:
+        _cliente_sin_reintentos = openai.OpenAI(api_key=openai.api_key, max_retries=0)
+    return _cliente_sin_reintentos
+
+def crear_con_plazo(limite: float, **kwargs):
+    """
+    Crea la respuesta con el cliente sin reintentos, reintentando los errores transitorios
+    (límite de uso, conexión, 5xx) con espera exponencial mientras no se pase el límite.
+
+    Args:
+        limite (float): Instante (time.monotonic) en que vence el plazo de la llamada completa.
+        **kwargs: Argumentos de chat.completions.create.
+
+    Returns:
+        La respuesta de chat.completions.create.
+    """
+    for intento in range(REINTENTOS + 1):
+        try:
+            return cliente_sin_reintentos().chat.completions.create(
+                timeout=max(0.0, limite - time.monotonic()), **kwargs)
+        except ERRORES_REINTENTABLES:
+            espera = ESPERA_REINTENTO_S * 2 ** intento
+            if intento == REINTENTOS or time.monotonic() + espera >= limite:
+                raise
+            time.sleep(espera)
+
+def call_gpt(prompt: str, modelo: str = "gpt-4.1-nano", max_tokens: int = 1500, temperature: float = 0.7, enrutador=None,
+             timeout: float = None, respaldo: str = None) -> str:
     """
     Llama a la API de OpenAI. Por defecto usa gpt-4o-mini.
     
@@ -55,12 +94,18 @@ def call_gpt(prompt: str, modelo: str = "gpt-4.1-nano", max_tokens: int = 1500,
         prompt (str): Texto del prompt a enviar.
         max_tokens (int): Máximo de tokens en la respuesta.
         temperature (float): Control de creatividad (0.0-1.0).
+        enrutador (EnrutadorModelos): Si se indica, se le informa la latencia y el costo de la llamada.
+        timeout (float): Segundos máximos de la llamada, incluidos los reintentos. None usa el cliente por defecto.
+        respaldo (str): Con timeout, texto a devolver si la llamada falla (plazo vencido, límite de uso,
+            error del servidor o de conexión) en lugar del mensaje de error.
     
     Returns:
         str: Respuesta del modelo.
     """
+    inicio = time.monotonic()
     try:
-        response = openai.chat.completions.create(
+        crear = openai.chat.completions.create if timeout is None else partial(crear_con_plazo, inicio + timeout)
+        response = crear(
             model=modelo,
             messages=[
                 {"role": "system", "content": """
@@ -102,7 +147,7 @@ Correcto: "La distribución por género muestra una participación del 70% de mu
                 {"role": "user", "content": prompt}
             ],
             max_tokens=max_tokens,
-            temperature=temperature
+            temperature=temperature,
         )
         result = response.choices[0].message.content.strip()
 
@@ -123,6 +168,10 @@ Correcto: "La distribución por género muestra una participación del 70% de mu
         precios = PRECIOS_MODELOS.get(modelo_base, {'input': 0, 'output': 0})
         
         cost_usd = (input_tokens * precios['input'] + output_tokens * precios['output']) / 1000000
+        latencia_s = time.monotonic() - inicio
+
+        if enrutador is not None:
+            enrutador.registrar(modelo, latencia_s, cost_usd)
 
         # Registrar información de tokens en la lista registro_tokens
         registro_tokens.append({
@@ -131,6 +180,7 @@ Correcto: "La distribución por género muestra una participación del 70% de mu
             'input_tokens': input_tokens,
             'output_tokens': output_tokens,
             'costo_usd': cost_usd,
+            'latencia_s': round(latencia_s, 2),
         })
 
         return result
@@ -139,17 +189,52 @@ Correcto: "La distribución por género muestra una participación del 70% de mu
 
 
     except openai.OpenAIError as e:
+        if timeout is not None:
+            # La demora cuenta para la latencia observada, así el enrutador deja de elegir el modelo si no alcanza el plazo
+            if enrutador is not None:
+                enrutador.registrar(modelo, time.monotonic() - inicio, 0.0)
+            # Un error de una llamada entre cientos no debe quedar escrito en el documento
+            if respaldo is not None:
+                return respaldo
         return f"Error en la API de OpenAI: {str(e)}"
     except Exception as e:
         return f"Error inesperado: {str(e)}"
 
-def analyze_dataframe(df: pd.DataFrame, pregunta: str = "", matriz: bool = False, tokens: int = 1000) -> str:
+def llamar_modelo(prompt: str, tipo: str, max_tokens: int, enrutador=None, respaldo: str = "") -> str:
+    """
+    Llama al modelo elegido por el enrutador para el tipo de llamada.
+    
+    Args:
+        prompt (str): Texto del prompt a enviar.
+        tipo (str): Tipo de llamada ('pregunta', 'mapa' o 'resumen').
+        max_tokens (int): Máximo de tokens en la respuesta.
+        enrutador (EnrutadorModelos): Si es None se usa el modelo por defecto de call_gpt.
+        respaldo (str): Texto a devolver si el enrutador no encuentra un modelo dentro del presupuesto
+            o si la llamada falla o no termina dentro del plazo.
+    
+    Returns:
+        str: Respuesta del modelo o el texto de respaldo.
+    """
+    if enrutador is None:
+        return call_gpt(prompt, max_tokens=max_tokens)
+
+    modelo = enrutador.elegir(tipo, prompt, max_tokens)
+    if modelo is None:
+        return respaldo
+
+    # El plazo también acota la llamada en curso y sus reintentos: si falla o no responde a tiempo se usa el respaldo
+    return call_gpt(prompt, modelo=modelo, max_tokens=max_tokens, enrutador=enrutador,
+                    timeout=enrutador.limite_llamada(tipo), respaldo=respaldo)
+
+def analyze_dataframe(df: pd.DataFrame, pregunta: str = "", matriz: bool = False, tokens: int = 1000, enrutador=None, respaldo: str = "") -> str:
     """
     Analiza un DataFrame y obtiene conclusiones.
     
     Args:
         df (pd.DataFrame): DataFrame a analizar.
         pregunta (str): Pregunta asociada a los datos del DataFrame.
+        enrutador (EnrutadorModelos): Enrutador que elige el modelo según plazo y costo.
+        respaldo (str): Texto a devolver si no queda presupuesto para llamar al modelo.
     
     Returns:
         str: Conclusión generada por el modelo.
@@ -191,15 +276,49 @@ def analyze_dataframe(df: pd.DataFrame, pregunta: str = "", matriz: bool = False
         Formato de salida: No uses markdown, solo texto plano. No uses titulos, solo párrafos. No uses emojis. No uses saltos de linea. Porcentajes con 1 decimal.
         """
     
-    return call_gpt(base_prompt, max_tokens=tokens)
+    tipo = 'mapa' if matriz is True else 'pregunta'
+    return llamar_modelo(base_prompt, tipo, tokens, enrutador, respaldo)
 
-def analyze_list(data_list: List[Union[int, float, str]], proyectos: pd.DataFrame = None, introduccion: str = "", tokens: int = 2000) -> str:
+def analyze_abiertas(temas: List[dict], pregunta: str = "", tokens: int = 800, enrutador=None, respaldo: str = "") -> str:
+    """
+    Resume los temas de una pregunta abierta a partir de su tamaño y unos pocos ejemplos.
+    
+    Args:
+        temas (List[dict]): Temas de respuestas_abiertas.agrupar_respuestas (tema, respuestas, porcentaje, ejemplos).
+        pregunta (str): Pregunta abierta analizada.
+        enrutador (EnrutadorModelos): Enrutador que elige el modelo según plazo y costo.
+        respaldo (str): Texto a devolver si no queda presupuesto para llamar al modelo.
+    
+    Returns:
+        str: Resumen de los temas generado por el modelo.
+    """
+    json_str = json.dumps(temas, ensure_ascii=False)
+
+    base_prompt = f"""
+    Pregunta abierta: '{pregunta}'.
+
+    Las respuestas fueron agrupadas automáticamente en temas. Para cada tema tienes sus términos principales,
+    la cantidad y el porcentaje de respuestas, y algunos ejemplos representativos.
+    Realiza un análisis conciso de máximo 3 líneas describiendo los temas más mencionados y su peso relativo.
+    Nombra cada tema con tus palabras a partir de los ejemplos. No cites datos personales.
+
+    Temas:
+    {json_str}
+
+    Formato de salida: No uses markdown, solo texto plano. No uses titulos, solo párrafos. No uses emojis. No uses saltos de linea. Porcentajes con 1 decimal.
+    """
+
+    return llamar_modelo(base_prompt, 'pregunta', tokens, enrutador, respaldo)
+
+def analyze_list(data_list: List[Union[int, float, str]], proyectos: pd.DataFrame = None, introduccion: str = "", tokens: int = 2000, enrutador=None, respaldo: str = "") -> str:
     """
     Analiza una lista y obtiene conclusiones.
     
     Args:
         data_list (List): Lista de datos a analizar.
         introduccion (str): Introducción o contexto del análisis.
+        enrutador (EnrutadorModelos): Enrutador que elige el modelo según plazo y costo.
+        respaldo (str): Texto a devolver si no queda presupuesto para llamar al modelo.
     
     Returns:
         str: Conclusión generada por el modelo.
@@ -231,9 +350,9 @@ def analyze_list(data_list: List[Union[int, float, str]], proyectos: pd.DataFram
     Formato de salida: No uses markdown, solo texto plano. No uses titulos, solo párrafos. No uses emojis. No uses saltos de linea.
     """
     
-    return call_gpt(base_prompt, max_tokens=tokens)
+    return llamar_modelo(base_prompt, 'resumen', tokens, enrutador, respaldo)
 
-def insight_parcial(data_list: List[Union[int, float, str]], pregunta: str = "", tokens: int = 1000) -> str:
+def insight_parcial(data_list: List[Union[int, float, str]], pregunta: str = "", tokens: int = 1000, enrutador=None) -> str:
 
     """
     Analiza una lista y obtiene insights claves.
@@ -255,10 +374,10 @@ def insight_parcial(data_list: List[Union[int, float, str]], pregunta: str = "",
     Conclusiones parciales:
     {list_str} """
     
-    return call_gpt(base_prompt, max_tokens=tokens)
+    return llamar_modelo(base_prompt, 'pregunta', tokens, enrutador)
 
 
-def insight_list(data_list: List[Union[int, float, str]], proyectos: pd.DataFrame = None, introduccion: str = "", tokens: int = 2000) -> str:
+def insight_list(data_list: List[Union[int, float, str]], proyectos: pd.DataFrame = None, introduccion: str = "", tokens: int = 2000, enrutador=None) -> str:
     """
     Analiza una lista y obtiene insights claves pero extensos, devolviendo un JSON válido.
     
@@ -267,6 +386,7 @@ def insight_list(data_list: List[Union[int, float, str]], proyectos: pd.DataFram
         proyectos (pd.DataFrame): DataFrame con información de proyectos.
         introduccion (str): Introducción o contexto del análisis.
         tokens (int): Máximo de tokens para la respuesta.
+        enrutador (EnrutadorModelos): Enrutador que elige el modelo según plazo y costo.
     
     Returns:
         str: JSON válido con insights generados por el modelo.
@@ -343,7 +463,11 @@ RECUERDA: Solo devuelve el JSON, absolutamente NADA más.
 """
     
     # Llamar al modelo GPT
-    respuesta_gpt = call_gpt(base_prompt, max_tokens=tokens)
+    respuesta_gpt = llamar_modelo(base_prompt, 'resumen', tokens, enrutador)
+
+    # Sin presupuesto para el modelo: JSON vacío, el informe omite la sección
+    if not respuesta_gpt:
+        return "{}"
     
     # Limpiar y validar el JSON
     json_limpio = limpiar_json_respuesta(respuesta_gpt)
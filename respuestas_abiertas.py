@@ -0,0 +1,164 @@
+"""
+Análisis de preguntas abiertas con costo acotado.
+
+Las respuestas de texto libre se limpian, se vectorizan localmente (TF-IDF) y se
+agrupan en temas con k-means. Al modelo solo se envían los temas con su tamaño y
+unos pocos ejemplos representativos, así los tokens de entrada no crecen con la
+cantidad de personas que respondieron.
+"""
+
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# Preguntas abiertas con datos personales: nunca se agrupan ni se envían al modelo
+TAGS_DATOS_PERSONALES = {
+    'nombre', 'correo_personal', 'celular', 'celular_de', 'tipo_documento', 'documento', 'nacimiento',
+}
+
+STOPWORDS_ES = [
+    'a', 'al', 'algo', 'algunos', 'ante', 'aunque', 'como', 'con', 'cual', 'cuando', 'de', 'del', 'desde',
+    'donde', 'el', 'ella', 'ellos', 'en', 'entre', 'era', 'es', 'esa', 'ese', 'eso', 'esta', 'este', 'esto',
+    'fue', 'ha', 'hay', 'la', 'las', 'le', 'les', 'lo', 'los', 'mas', 'me', 'mi', 'mis', 'mucho', 'muy',
+    'nada', 'ni', 'no', 'nos', 'o', 'para', 'pero', 'por', 'porque', 'que', 'se', 'ser', 'si', 'sin', 'sobre',
+    'son', 'su', 'sus', 'tambien', 'te', 'tiene', 'todo', 'tu', 'un', 'una', 'uno', 'y', 'ya', 'yo',
+]
+
+# Tema de las respuestas sin términos (solo stopwords o signos, como "nada", "no sé" o "."): no se agrupan
+ETIQUETA_SIN_CONTENIDO = 'Sin contenido / No sabe'
+
+
+def agrupar_respuestas(df_pregunta: pd.DataFrame, limpiar: Optional[Callable] = None, max_temas: int = 8,
+                       muestras: int = 3, min_respuestas: int = 5, semilla: int = 0) -> Tuple[pd.DataFrame, List[dict]]:
+    """
+    Agrupa en temas las respuestas abiertas de una pregunta.
+
+    Args:
+        df_pregunta (pd.DataFrame): Filas de la pregunta con las columnas 'answer' y 'tipo_test'.
+        limpiar (Callable): Función de limpieza de texto (limpiar_texto del notebook).
+        max_temas (int): Cantidad máxima de temas.
+        muestras (int): Ejemplos representativos por tema.
+        min_respuestas (int): Por debajo de esta cantidad de respuestas no se agrupa.
+        semilla (int): Semilla de k-means para que el informe sea reproducible.
+
+    Returns:
+        tuple: (tabla para el documento, lista de temas con tamaño, porcentaje y ejemplos).
+        Ambos vacíos si no hay respuestas suficientes. Las respuestas sin términos van en un
+        último tema ETIQUETA_SIN_CONTENIDO; los porcentajes son sobre todas las respuestas.
+    """
+    limpiar = limpiar or (lambda texto: '' if pd.isna(texto) else str(texto).strip())
+
+    respuestas = df_pregunta[['answer', 'tipo_test']].copy()
+    respuestas['texto'] = respuestas['answer'].map(limpiar)
+    respuestas = respuestas[respuestas['texto'] != '']
+
+    if len(respuestas) < min_respuestas:
+        return pd.DataFrame(), []
+
+    # Se vectoriza cada texto distinto una sola vez, con su frecuencia como peso
+    respuestas['clave'] = respuestas['texto'].str.lower()
+    distintas = respuestas.groupby('clave').agg(texto=('texto', 'first'), peso=('texto', 'size')).reset_index()
+
+    try:
+        vectorizador = TfidfVectorizer(strip_accents='unicode', stop_words=STOPWORDS_ES,
+                                       ngram_range=(1, 2), max_features=5000, sublinear_tf=True)
+        matriz = vectorizador.fit_transform(distintas['clave'])
+    except ValueError:
+        # Solo hay stopwords o signos: no hay vocabulario para agrupar
+        return pd.DataFrame(), []
+
+    total = int(distintas['peso'].sum())
+
+    # Las respuestas sin términos quedarían en el tema más cercano e inflarían su tamaño
+    con_terminos = np.asarray(matriz.getnnz(axis=1) > 0)
+    sin_contenido = distintas[~con_terminos].sort_values('peso', ascending=False)
+    distintas = distintas[con_terminos].reset_index(drop=True)
+    matriz = matriz[con_terminos]
+
+    n_temas = int(min(max_temas, len(distintas), max(1, round(np.sqrt(len(distintas) / 2)))))
+    if n_temas > 1:
+        kmeans = MiniBatchKMeans(n_clusters=n_temas, random_state=semilla, n_init=3, batch_size=1024)
+        etiquetas = kmeans.fit_predict(matriz, sample_weight=distintas['peso'].to_numpy())
+        centroides = kmeans.cluster_centers_
+    else:
+        etiquetas = np.zeros(len(distintas), dtype=int)
+        centroides = np.asarray(matriz.mean(axis=0))
+
+    terminos = vectorizador.get_feature_names_out()
+    similitud = np.asarray(matriz @ centroides.T)  # (textos distintos x temas)
+
+    temas = []
+    for t in range(centroides.shape[0]):
+        miembros = np.flatnonzero(etiquetas == t)
+        if len(miembros) == 0:
+            continue
+
+        orden = np.argsort(centroides[t])[::-1][:3]
+        principales = [terminos[i] for i in orden if centroides[t][i] > 0]
+        cercanos = miembros[np.argsort(similitud[miembros, t])[::-1][:muestras]]
+        cantidad = int(distintas['peso'].iloc[miembros].sum())
+
+        temas.append({
+            'id': t,
+            'tema': ', '.join(principales),
+            'respuestas': cantidad,
+            'porcentaje': round(cantidad * 100 / total, 1),
+            'ejemplos': [distintas['texto'].iloc[i][:200] for i in cercanos],
+        })
+
+    temas.sort(key=lambda x: x['respuestas'], reverse=True)
+
+    if not sin_contenido.empty:
+        cantidad = int(sin_contenido['peso'].sum())
+        temas.append({
+            'id': -1,
+            'tema': ETIQUETA_SIN_CONTENIDO,
+            'respuestas': cantidad,
+            'porcentaje': round(cantidad * 100 / total, 1),
+            'ejemplos': [texto[:200] for texto in sin_contenido['texto'].head(muestras)],
+        })
+
+    # Tabla por tema y tipo de test
+    ids = dict(zip(distintas['clave'], etiquetas))
+    ids.update(dict.fromkeys(sin_contenido['clave'], -1))
+    respuestas['id'] = respuestas['clave'].map(ids)
+    conteo = pd.crosstab(respuestas['id'], respuestas['tipo_test'])
+
+    filas = []
+    for tema in temas:
+        fila = {'Tema': tema['tema']}
+        for tipo in conteo.columns:
+            fila[tipo] = int(conteo.loc[tema['id'], tipo])
+        fila['% del total'] = f"{tema['porcentaje']}%"
+        fila['Ejemplo'] = tema['ejemplos'][0]
+        filas.append(fila)
+
+    for tema in temas:
+        del tema['id']
+
+    return pd.DataFrame(filas), temas
+
+
+def resumen_temas(temas: List[dict]) -> str:
+    """Resumen en texto de los temas, usado sin IA o como respaldo del modelo."""
+    if not temas:
+        return ""
+
+    sin_contenido = [tema for tema in temas if tema['tema'] == ETIQUETA_SIN_CONTENIDO]
+    temas = [tema for tema in temas if tema['tema'] != ETIQUETA_SIN_CONTENIDO]
+
+    analisis = [f"Las respuestas abiertas se agruparon en {len(temas)} tema{'s' if len(temas) > 1 else ''}."]
+    principal = temas[0]
+    analisis.append(
+        f"El tema más frecuente gira en torno a '{principal['tema']}' ({principal['porcentaje']:.1f}% de las respuestas)."
+    )
+    if len(temas) > 1:
+        menor = temas[-1]
+        analisis.append(f"El tema menos mencionado es '{menor['tema']}' ({menor['porcentaje']:.1f}%).")
+    if sin_contenido:
+        analisis.append(f"El {sin_contenido[0]['porcentaje']:.1f}% de las respuestas no tuvo contenido (por ejemplo 'nada' o 'no sé').")
+
+    return " ".join(analisis)
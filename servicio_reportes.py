@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""
+Servicio HTTP local para generar reportes de Word sin abrir Jupyter.
+
+Recibe pedidos de reporte (proyectos, tipo de test, dimensiones, IA sí/no), los
+encola y los ejecuta en un pool de procesos que ya tienen importados matplotlib,
+seaborn, boto3 y python-docx, así cada reporte no paga el arranque en frío.
+Cada trabajo corre las celdas de "NB Cuestionarios.ipynb" y guarda su .docx en su propia
+carpeta; los archivos que se acumulan entre reportes (uso_modelo.csv y
+matches_tags_confirmados.csv) quedan en la carpeta del repositorio, igual que desde Jupyter,
+y los workers los actualizan bajo un bloqueo de archivo (bloqueo_archivos).
+
+Uso:
+    python servicio_reportes.py --puerto 8000 --workers 2 --max-cola 10
+
+Endpoints:
+    POST /reportes                 Encola un reporte. 202 con el id, 400 si el pedido es inválido, 429 si la cola está llena,
+                                   503 si el pool de workers se rompió (se reconstruye para los siguientes pedidos).
+    GET  /reportes                 Lista los trabajos y su estado.
+    GET  /reportes/<id>            Estado y eventos del trabajo.
+    GET  /reportes/<id>/eventos    Progreso en vivo (text/event-stream).
+    GET  /reportes/<id>/docx       Descarga el .docx terminado.
+
+Ejemplo de pedido:
+    {"project_ids": [72, 75], "tipo_test": "evs", "dimensiones": ["instituciones"], "IA": false}
+"""
+
+import argparse
+import glob
+import json
+import math
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+import ejecutor_notebook as EN
+
+DIRECTORIO_REPO = os.path.dirname(os.path.abspath(__file__))
+
+# Parámetros de lista_para_analizar del notebook
+DIMENSIONES = ['proyecto', 'instituciones', 'grade', 'career', 'educacion', 'grade_section', 'genero', 'etario']
+
+# Valores aceptados de tipo_test (los atajos del notebook o un tipo de test puntual)
+TIPOS_TEST = {
+    'evs', 'evm', 'mvs',
+    'cuestionario de entrada', 'cuestionario medio', 'cuestionario de salida',
+    'examen de casos inicial', 'examen de casos final', 'examen final',
+    'cuestionario de satisfacción modular', 'cuestionario de satisfacción final',
+}
+
+ESTADOS_FINALES = {'terminado', 'error'}
+
+
+def validar_pedido(pedido: Dict) -> Dict:
+    """
+    Valida el pedido de reporte y lo normaliza.
+
+    Args:
+        pedido (dict): Cuerpo JSON del POST.
+
+    Returns:
+        dict: Pedido con project_ids, tipo_test, dimensiones e IA normalizados.
+
+    Raises:
+        ValueError: Si algún campo es inválido. Los valores terminan dentro de la query de Athena,
+        por eso solo se aceptan ids enteros y tipos de test conocidos. IA debe ser un booleano
+        de JSON (un texto como "false" no se interpreta) y los topes, números positivos.
+    """
+    if not isinstance(pedido, dict):
+        raise ValueError("El pedido debe ser un objeto JSON")
+
+    project_ids = pedido.get('project_ids')
+    if isinstance(project_ids, (int, str)):
+        project_ids = [project_ids]
+    if not project_ids or not isinstance(project_ids, list):
+        raise ValueError("'project_ids' debe ser una lista de ids de proyecto")
+    if any(isinstance(p, bool) or not isinstance(p, (int, str)) for p in project_ids):
+        raise ValueError("'project_ids' solo admite números enteros")
+    try:
+        project_ids = [int(str(p).strip()) for p in project_ids]
+    except ValueError:
+        raise ValueError("'project_ids' solo admite números enteros")
+
+    tipo_test = pedido.get('tipo_test', 'evs')
+    if not isinstance(tipo_test, str) or tipo_test.strip().lower() not in TIPOS_TEST:
+        raise ValueError(f"'tipo_test' debe ser uno de: {sorted(TIPOS_TEST)}")
+    tipo_test = tipo_test.strip().lower()
+
+    dimensiones = pedido.get('dimensiones', [])
+    if not isinstance(dimensiones, list) or any(not isinstance(d, str) or d not in DIMENSIONES for d in dimensiones):
+        raise ValueError(f"'dimensiones' debe ser una lista con valores de: {DIMENSIONES}")
+
+    # IA activa llamadas pagas: solo se acepta true/false de JSON
+    ia = pedido.get('IA', False)
+    if not isinstance(ia, bool):
+        raise ValueError("'IA' debe ser true o false")
+
+    normalizado = {
+        'project_ids': project_ids,
+        'tipo_test': tipo_test,
+        'dimensiones': dimensiones,
+        'IA': ia,
+    }
+    for campo in ('plazo_informe_min', 'tope_costo_usd'):
+        valor = pedido.get(campo)
+        if valor is None:
+            continue
+        if isinstance(valor, bool) or not isinstance(valor, (int, float)) or not math.isfinite(valor) or valor <= 0:
+            raise ValueError(f"'{campo}' debe ser un número positivo")
+        normalizado[campo] = float(valor)
+
+    return normalizado
+
+
+# --- Procesos del pool ---
+
+_cola_progreso = None
+_celdas = None
+
+
+def _iniciar_worker(cola_progreso) -> None:
+    """Importa las librerías pesadas y lee el notebook una sola vez por proceso."""
+    global _cola_progreso, _celdas
+    _cola_progreso = cola_progreso
+
+    if DIRECTORIO_REPO not in sys.path:
+        sys.path.insert(0, DIRECTORIO_REPO)
+    # Las rutas relativas del notebook (uso_modelo.csv, matches de tags) son compartidas entre reportes;
+    # se actualizan con BA.bloqueo para que dos reportes que terminan juntos no se pisen
+    os.chdir(DIRECTORIO_REPO)
+
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot  # noqa: F401
+    import seaborn  # noqa: F401
+    import boto3  # noqa: F401
+    import docx  # noqa: F401
+    import pandas  # noqa: F401
+
+    _celdas = EN.cargar_celdas()
+
+
+def _calentar() -> int:
+    """Tarea vacía para levantar los procesos del pool al iniciar el servicio."""
+    return os.getpid()
+
+
+def _generar_reporte(id_trabajo: str, pedido: Dict, directorio: str) -> str:
+    """Ejecuta el notebook para un pedido y devuelve la ruta del .docx generado."""
+    os.makedirs(directorio, exist_ok=True)
+
+    # El registro de tokens es global del módulo: no mezclar el uso de trabajos anteriores
+    if 'openIA_analisis_conclusiones' in sys.modules:
+        sys.modules['openIA_analisis_conclusiones'].registro_tokens.clear()
+
+    def al_avanzar(posicion, total, celda):
+        _cola_progreso.put((id_trabajo, {
+            'tipo': 'progreso',
+            'celda': posicion + 1,
+            'total': total,
+            'seccion': celda['seccion'],
+        }))
+
+    def sobrescribir(espacio):
+        espacio['project_id'] = ', '.join(str(p) for p in pedido['project_ids'])
+        espacio['tipo_test'] = pedido['tipo_test']
+        espacio['IA'] = pedido['IA']
+        espacio['carpeta_salida'] = directorio  # Solo el .docx va a la carpeta del trabajo
+        espacio['lista_graficos'] = espacio['lista_para_analizar'](**{d: True for d in pedido['dimensiones']})
+        for campo in ('plazo_informe_min', 'tope_costo_usd'):
+            if campo in pedido:
+                espacio[campo] = pedido[campo]
+
+    EN.ejecutar_celdas(_celdas, sobrescribir=sobrescribir, al_avanzar=al_avanzar)
+
+    documentos = sorted(glob.glob(os.path.join(directorio, '*.docx')), key=os.path.getmtime)
+    if not documentos:
+        raise RuntimeError("El notebook terminó sin generar un .docx")
+    return documentos[-1]
+
+
+# --- Servicio ---
+
+class ServicioReportes:
+    """
+    Cola de trabajos con un pool de procesos precalentados.
+
+    Args:
+        workers (int): Reportes que se generan en paralelo.
+        max_cola (int): Máximo de trabajos en cola o en ejecución; por encima se rechaza con 429.
+        directorio (str): Carpeta donde cada trabajo guarda su .docx.
+    """
+
+    def __init__(self, workers: int = 2, max_cola: int = 10, directorio: str = 'reportes_generados'):
+        self.workers = workers
+        self.max_cola = max_cola
+        self.directorio = os.path.abspath(directorio)
+        os.makedirs(self.directorio, exist_ok=True)
+
+        self.contexto = multiprocessing.get_context('spawn')
+        self.cola_progreso = self.contexto.Queue()
+        self.pool = self._crear_pool()
+
+        self.trabajos = {}
+        self.condicion = threading.Condition()
+        threading.Thread(target=self._escuchar_progreso, daemon=True).start()
+
+        # Una tarea por worker obliga a levantar (y calentar) todos los procesos ahora
+        for futuro in [self.pool.submit(_calentar) for _ in range(workers)]:
+            futuro.result()
+
+    def _crear_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=self.contexto,
+            initializer=_iniciar_worker,
+            initargs=(self.cola_progreso,),
+        )
+
+    def _reconstruir_pool(self, pool_roto: ProcessPoolExecutor) -> None:
+        """Reemplaza el pool si un worker murió (por ejemplo por falta de memoria); sin esto cada submit falla."""
+        with self.condicion:
+            if self.pool is not pool_roto:
+                return  # Otro hilo ya lo reconstruyó
+            self.pool = self._crear_pool()
+        pool_roto.shutdown(wait=False, cancel_futures=True)
+
+    def _escuchar_progreso(self) -> None:
+        while True:
+            id_trabajo, evento = self.cola_progreso.get()
+            with self.condicion:
+                trabajo = self.trabajos.get(id_trabajo)
+                if trabajo is None:
+                    continue
+                if trabajo['estado'] == 'en_cola':
+                    trabajo['estado'] = 'ejecutando'
+                    trabajo['inicio'] = time.time()
+                trabajo['eventos'].append(evento)
+                self.condicion.notify_all()
+
+    def _marcar_error(self, id_trabajo: str, error: Exception) -> None:
+        with self.condicion:
+            trabajo = self.trabajos[id_trabajo]
+            trabajo['error'] = f"{type(error).__name__}: {error}"
+            trabajo['estado'] = 'error'
+            trabajo['fin'] = time.time()
+            trabajo['eventos'].append({'tipo': 'estado', 'estado': trabajo['estado'], 'error': trabajo['error']})
+            self.condicion.notify_all()
+
+    def _al_terminar(self, id_trabajo: str, pool: ProcessPoolExecutor, futuro) -> None:
+        try:
+            docx = futuro.result()
+        except BrokenProcessPool as e:
+            self._marcar_error(id_trabajo, e)
+            self._reconstruir_pool(pool)
+            return
+        except Exception as e:
+            self._marcar_error(id_trabajo, e)
+            return
+
+        with self.condicion:
+            trabajo = self.trabajos[id_trabajo]
+            trabajo['docx'] = docx
+            trabajo['estado'] = 'terminado'
+            trabajo['fin'] = time.time()
+            trabajo['eventos'].append({'tipo': 'estado', 'estado': trabajo['estado'], 'error': trabajo['error']})
+            self.condicion.notify_all()
+
+    def encolar(self, pedido: Dict) -> Optional[str]:
+        """
+        Encola un pedido ya validado.
+
+        Returns:
+            str: Id del trabajo, o None si la cola está llena. Si el pool está roto el trabajo
+            queda en estado 'error' y el pool se reconstruye para los siguientes pedidos.
+        """
+        with self.condicion:
+            activos = sum(1 for t in self.trabajos.values() if t['estado'] not in ESTADOS_FINALES)
+            if activos >= self.max_cola:
+                return None
+
+            id_trabajo = uuid.uuid4().hex[:12]
+            self.trabajos[id_trabajo] = {
+                'id': id_trabajo,
+                'pedido': pedido,
+                'estado': 'en_cola',
+                'creado': time.time(),
+                'inicio': None,
+                'fin': None,
+                'docx': None,
+                'error': None,
+                'eventos': [],
+            }
+            pool = self.pool
+
+        try:
+            futuro = pool.submit(_generar_reporte, id_trabajo, pedido,
+                                 os.path.join(self.directorio, id_trabajo))
+        except BrokenProcessPool as e:
+            # Un trabajo huérfano en 'en_cola' ocuparía lugar en max_cola para siempre
+            self._marcar_error(id_trabajo, e)
+            self._reconstruir_pool(pool)
+            return id_trabajo
+
+        futuro.add_done_callback(partial(self._al_terminar, id_trabajo, pool))
+        return id_trabajo
+
+    def estado(self, id_trabajo: str) -> Optional[Dict]:
+        """Copia del estado del trabajo, sin la ruta local del .docx."""
+        with self.condicion:
+            trabajo = self.trabajos.get(id_trabajo)
+            if trabajo is None:
+                return None
+            resumen = {k: v for k, v in trabajo.items() if k != 'docx'}
+            resumen['eventos'] = list(trabajo['eventos'])
+            resumen['docx_listo'] = trabajo['docx'] is not None
+            return resumen
+
+    def cerrar(self) -> None:
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class ManejadorReportes(BaseHTTPRequestHandler):
+    """Rutas HTTP del servicio. El servidor expone la instancia de ServicioReportes en `servicio`."""
+
+    def _responder_json(self, codigo: int, cuerpo, encabezados: Optional[Dict] = None) -> None:
+        datos = json.dumps(cuerpo, ensure_ascii=False).encode('utf-8')
+        self.send_response(codigo)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(datos)))
+        for clave, valor in (encabezados or {}).items():
+            self.send_header(clave, valor)
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/reportes':
+            return self._responder_json(404, {'error': 'Ruta no encontrada'})
+
+        try:
+            largo = int(self.headers.get('Content-Length', 0))
+            pedido = validar_pedido(json.loads(self.rfile.read(largo) or b'{}'))
+        except (ValueError, TypeError) as e:  # JSONDecodeError y UnicodeDecodeError son ValueError
+            return self._responder_json(400, {'error': str(e)})
+
+        id_trabajo = self.server.servicio.encolar(pedido)
+        if id_trabajo is None:
+            return self._responder_json(429, {'error': 'La cola de reportes está llena, reintente más tarde'},
+                                        {'Retry-After': '30'})
+
+        estado = self.server.servicio.estado(id_trabajo)
+        if estado['estado'] == 'error':
+            return self._responder_json(503, {'id': id_trabajo, 'estado': 'error', 'error': estado['error']},
+                                        {'Retry-After': '5'})
+
+        self._responder_json(202, {'id': id_trabajo, 'estado': 'en_cola'}, {'Location': f'/reportes/{id_trabajo}'})
+
+    def do_GET(self):
+        partes = [p for p in self.path.split('?')[0].split('/') if p]
+        servicio = self.server.servicio
+
+        if partes == ['reportes']:
+            with servicio.condicion:
+                ids = list(servicio.trabajos)
+            return self._responder_json(200, [
+                {k: v for k, v in servicio.estado(i).items() if k != 'eventos'} for i in ids
+            ])
+
+        if len(partes) < 2 or partes[0] != 'reportes':
+            return self._responder_json(404, {'error': 'Ruta no encontrada'})
+
+        id_trabajo = partes[1]
+        if servicio.estado(id_trabajo) is None:
+            return self._responder_json(404, {'error': f'No existe el trabajo {id_trabajo}'})
+
+        if len(partes) == 2:
+            return self._responder_json(200, servicio.estado(id_trabajo))
+        if partes[2] == 'eventos':
+            return self._transmitir_eventos(id_trabajo)
+        if partes[2] == 'docx':
+            return self._enviar_docx(id_trabajo)
+
+        self._responder_json(404, {'error': 'Ruta no encontrada'})
+
+    def _transmitir_eventos(self, id_trabajo: str) -> None:
+        servicio = self.server.servicio
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+
+        enviados = 0
+        try:
+            while True:
+                with servicio.condicion:
+                    trabajo = servicio.trabajos[id_trabajo]
+                    servicio.condicion.wait_for(
+                        lambda: len(trabajo['eventos']) > enviados or trabajo['estado'] in ESTADOS_FINALES,
+                        timeout=15,
+                    )
+                    nuevos = trabajo['eventos'][enviados:]
+                    terminado = trabajo['estado'] in ESTADOS_FINALES
+
+                for evento in nuevos:
+                    self.wfile.write(f"data: {json.dumps(evento, ensure_ascii=False)}\n\n".encode('utf-8'))
+                if not nuevos:
+                    self.wfile.write(b": sigue en curso\n\n")
+                self.wfile.flush()
+                enviados += len(nuevos)
+
+                if terminado:
+                    break
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # El cliente cerró la conexión
+
+    def _enviar_docx(self, id_trabajo: str) -> None:
+        servicio = self.server.servicio
+        with servicio.condicion:
+            trabajo = servicio.trabajos[id_trabajo]
+            ruta, error = trabajo['docx'], trabajo['error']
+        if error is not None:
+            return self._responder_json(409, {'error': f'El reporte falló: {error}'})
+        if ruta is None:
+            return self._responder_json(409, {'error': 'El reporte todavía no está listo'})
+
+        with open(ruta, 'rb') as f:
+            datos = f.read()
+        nombre = os.path.basename(ruta).encode('ascii', 'ignore').decode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document')
+        self.send_header('Content-Disposition', f'attachment; filename="{nombre}"')
+        self.send_header('Content-Length', str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+
+def main():
+    """Función principal del script."""
+    parser = argparse.ArgumentParser(description="Servicio local de generación de reportes de Word")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=2, help="Reportes generados en paralelo")
+    parser.add_argument('--max-cola', type=int, default=10, help="Trabajos en cola o en ejecución antes de responder 429")
+    parser.add_argument('--salida', default='reportes_generados', help="Carpeta de los .docx generados")
+    args = parser.parse_args()
+
+    print(f"Calentando {args.workers} worker(s)...")
+    servicio = ServicioReportes(workers=args.workers, max_cola=args.max_cola, directorio=args.salida)
+
+    servidor = ThreadingHTTPServer((args.host, args.puerto), ManejadorReportes)
+    servidor.servicio = servicio
+    print(f"Servicio de reportes escuchando en http://{args.host}:{args.puerto}")
+
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\nDeteniendo el servicio...")
+    finally:
+        servidor.server_close()
+        servicio.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Significancia de los cambios entre dos tests (por ejemplo entrada y salida).
+
+Para cada pregunta x respuesta (y opcionalmente x dimensión) se compara la proporción
+de estudiantes que eligió la respuesta en cada test con una prueba z de dos
+proporciones (equivalente al chi-cuadrado de 2x2 sin corrección de Yates) y se
+calcula el tamaño del efecto con la h de Cohen. Todo se resuelve con una pasada de
+NumPy sobre los conteos agregados, así el costo no depende de la cantidad de preguntas.
+Los p-valores se corrigen por comparaciones múltiples con Benjamini-Hochberg.
+"""
+
+from typing import List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.special import erfc
+
+
+def ajustar_bh(p_valores: np.ndarray) -> np.ndarray:
+    """
+    Ajusta p-valores por Benjamini-Hochberg (tasa de falsos descubrimientos).
+
+    Args:
+        p_valores (np.ndarray): P-valores sin ajustar.
+
+    Returns:
+        np.ndarray: P-valores ajustados, en el mismo orden.
+    """
+    m = len(p_valores)
+    if m == 0:
+        return p_valores
+
+    orden = np.argsort(p_valores)
+    ajustados = p_valores[orden] * m / np.arange(1, m + 1)
+    ajustados = np.minimum.accumulate(ajustados[::-1])[::-1]
+
+    resultado = np.empty(m)
+    resultado[orden] = np.minimum(ajustados, 1.0)
+    return resultado
+
+
+def proporciones(df: pd.DataFrame, claves: Sequence[str] = ()) -> pd.DataFrame:
+    """
+    Estudiantes que eligieron cada respuesta sobre los que respondieron, por claves x test.
+
+    Es la base de porcentajes común a las tablas de respuestas, los mapas de calor y
+    comparar_tests. En multiselección cada opción se cuenta por estudiante, así los
+    porcentajes de una pregunta pueden sumar más de 100%.
+
+    Args:
+        df (pd.DataFrame): Respuestas con 'tipo_test', 'answer', 'student_id' y las claves.
+        claves (Sequence[str]): Columnas de agrupación adicionales, por ejemplo ['question'].
+
+    Returns:
+        pd.DataFrame: Columnas claves, tipo_test, answer, conteo, base y porcentaje (0 a 1).
+    """
+    claves = list(claves)
+    datos = df.loc[df['answer'].notna(), claves + ['tipo_test', 'answer', 'student_id']]
+
+    conteo = (
+        datos.drop_duplicates()
+        .groupby(claves + ['tipo_test', 'answer'], observed=True)
+        .size()
+        .reset_index(name='conteo')
+    )
+    base = (
+        datos.drop_duplicates(claves + ['tipo_test', 'student_id'])
+        .groupby(claves + ['tipo_test'], observed=True)
+        .size()
+        .reset_index(name='base')
+    )
+
+    tabla = conteo.merge(base, on=claves + ['tipo_test'])
+    tabla['porcentaje'] = tabla['conteo'] / tabla['base']
+    return tabla
+
+
+def comparar_tests(df: pd.DataFrame, tests: Sequence[str], claves: Sequence[str] = ('question',),
+                   alfa: float = 0.05, efecto_minimo: float = 0.1) -> pd.DataFrame:
+    """
+    Prueba de dos proporciones para cada combinación de claves x respuesta.
+
+    Las proporciones salen de proporciones(): estudiantes que eligieron la respuesta sobre
+    los que respondieron la pregunta en ese test, la misma base que las tablas del informe.
+    Con la cohorte filtrada los estudiantes son los mismos en ambos tests; la prueba
+    no usa ese apareamiento, por lo que tiende a ser conservadora.
+
+    Args:
+        df (pd.DataFrame): Respuestas con 'tipo_test', 'answer', 'student_id' y las claves.
+        tests (Sequence[str]): Los dos tests a comparar, en orden (el cambio es segundo - primero).
+        claves (Sequence[str]): Columnas de agrupación, por ejemplo ['question'] o ['question', 'grade'].
+        alfa (float): Nivel de significancia sobre el p-valor ajustado.
+        efecto_minimo (float): |h| mínima para marcar un cambio (0.2 es un efecto pequeño según Cohen).
+
+    Returns:
+        pd.DataFrame: Una fila por claves x respuesta con conteos, bases, porcentajes,
+        diferencia_pp, h, z, p_valor, p_ajustado y significativo.
+    """
+    claves = list(claves)
+    tests = list(tests)
+    if len(tests) != 2:
+        raise ValueError("La comparación solo soporta 2 tipos de test.")
+
+    tabla = proporciones(df[df['tipo_test'].isin(tests)], claves)
+
+    conteo = (
+        tabla.set_index(claves + ['answer', 'tipo_test'])['conteo']
+        .unstack('tipo_test', fill_value=0)
+        .reindex(columns=tests, fill_value=0)
+    )
+    conteo.columns = ['conteo_1', 'conteo_2']
+
+    base = (
+        tabla.drop_duplicates(claves + ['tipo_test'])
+        .set_index(claves + ['tipo_test'])['base']
+        .unstack('tipo_test', fill_value=0)
+        .reindex(columns=tests, fill_value=0)
+    )
+    base.columns = ['base_1', 'base_2']
+
+    resultado = conteo.reset_index().merge(base.reset_index(), on=claves)
+    # Solo se comparan las preguntas que aparecen en ambos tests
+    resultado = resultado[(resultado['base_1'] > 0) & (resultado['base_2'] > 0)].reset_index(drop=True)
+
+    x1, x2 = resultado['conteo_1'].to_numpy(float), resultado['conteo_2'].to_numpy(float)
+    n1, n2 = resultado['base_1'].to_numpy(float), resultado['base_2'].to_numpy(float)
+
+    p1, p2 = x1 / n1, x2 / n2
+    p_comun = (x1 + x2) / (n1 + n2)
+    error = np.sqrt(p_comun * (1 - p_comun) * (1 / n1 + 1 / n2))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = np.where(error > 0, (p2 - p1) / error, 0.0)
+
+    p_valor = erfc(np.abs(z) / np.sqrt(2))
+    h = 2 * np.arcsin(np.sqrt(p2)) - 2 * np.arcsin(np.sqrt(p1))
+    p_ajustado = ajustar_bh(p_valor)
+
+    resultado['porcentaje_1'] = p1 * 100
+    resultado['porcentaje_2'] = p2 * 100
+    resultado['diferencia_pp'] = (p2 - p1) * 100
+    resultado['h'] = h
+    resultado['z'] = z
+    resultado['p_valor'] = p_valor
+    resultado['p_ajustado'] = p_ajustado
+    resultado['significativo'] = (p_ajustado < alfa) & (np.abs(h) >= efecto_minimo)
+    resultado.attrs['tests'] = tests
+
+    return resultado
+
+
+def respuestas_significativas(resultado: pd.DataFrame, pregunta: str) -> Set[str]:
+    """Respuestas de la pregunta con un cambio significativo entre los tests."""
+    filas = resultado[(resultado['question'] == pregunta) & resultado['significativo']]
+    return set(filas['answer'].astype(str))
+
+
+def celdas_significativas(resultado: pd.DataFrame, pregunta: str, dimension: str) -> Set[Tuple[str, str]]:
+    """Pares (valor de la dimensión, respuesta) de la pregunta con un cambio significativo."""
+    filas = resultado[(resultado['question'] == pregunta) & resultado['significativo']]
+    return set(zip(filas[dimension].astype(str), filas['answer'].astype(str)))
+
+
+def cambios_significativos(resultado: pd.DataFrame, pregunta: str, dimension: Optional[str] = None,
+                           max_filas: int = 30) -> pd.DataFrame:
+    """
+    Tabla compacta con solo los cambios significativos de una pregunta, para los prompts.
+
+    Args:
+        resultado (pd.DataFrame): Salida de comparar_tests.
+        pregunta (str): Pregunta a filtrar.
+        dimension (str): Columna de la dimensión si el resultado se calculó por dimensión.
+        max_filas (int): Cantidad máxima de cambios, priorizando los de mayor efecto.
+
+    Returns:
+        pd.DataFrame: Columnas [dimension], Respuesta y Diferencia (pp).
+    """
+    filas = resultado[(resultado['question'] == pregunta) & resultado['significativo']]
+    filas = filas.loc[filas['h'].abs().sort_values(ascending=False).index].head(max_filas)
+
+    columnas: List[str] = ([dimension] if dimension else []) + ['answer', 'diferencia_pp']
+    tabla = filas[columnas].rename(columns={'answer': 'Respuesta', 'diferencia_pp': 'Diferencia (pp)'})
+    tabla['Diferencia (pp)'] = tabla['Diferencia (pp)'].round(1)
+
+    return tabla.reset_index(drop=True)
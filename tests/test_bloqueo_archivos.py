@@ -0,0 +1,34 @@
+"""Pruebas del bloqueo de archivos compartidos entre procesos."""
+
+import multiprocessing
+import os
+
+import pandas as pd
+
+import bloqueo_archivos as BA
+
+PROCESOS = 4
+ACTUALIZACIONES = 15
+
+
+def actualizar(ruta, proceso):
+    """Lee, combina y reescribe el CSV como la celda de uso_modelo.csv del notebook."""
+    for i in range(ACTUALIZACIONES):
+        nuevo = pd.DataFrame({'proceso': [proceso], 'i': [i]})
+        with BA.bloqueo(ruta):
+            if os.path.exists(ruta):
+                nuevo = pd.concat([pd.read_csv(ruta), nuevo])
+            nuevo.to_csv(ruta, index=False)
+
+
+def test_actualizaciones_concurrentes_no_pierden_filas(tmp_path):
+    ruta = str(tmp_path / 'uso_modelo.csv')
+    contexto = multiprocessing.get_context('spawn')
+    procesos = [contexto.Process(target=actualizar, args=(ruta, p)) for p in range(PROCESOS)]
+    for proceso in procesos:
+        proceso.start()
+    for proceso in procesos:
+        proceso.join(timeout=120)
+        assert proceso.exitcode == 0
+
+    assert len(pd.read_csv(ruta)) == PROCESOS * ACTUALIZACIONES
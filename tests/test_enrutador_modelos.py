@@ -0,0 +1,91 @@
+"""Pruebas del enrutador de modelos (lógica pura, sin llamadas a OpenAI)."""
+
+import pytest
+
+import enrutador_modelos as ER
+
+PRECIOS = {
+    'gpt-4.1': {'input': 2.00, 'output': 8.00},
+    'gpt-4.1-mini': {'input': 0.40, 'output': 1.60},
+    'gpt-4.1-nano': {'input': 0.10, 'output': 0.40},
+}
+PROMPT = 'x' * 4000  # ~1000 tokens de entrada
+
+
+def costo(modelo, max_tokens=1000):
+    return (1000 * PRECIOS[modelo]['input'] + max_tokens * PRECIOS[modelo]['output']) / 1000000
+
+
+def test_sin_limites_usa_el_modelo_mas_fuerte():
+    enrutador = ER.EnrutadorModelos(PRECIOS)
+    assert enrutador.elegir('resumen', PROMPT, 1000) == 'gpt-4.1'
+    assert enrutador.elegir('pregunta', PROMPT, 1000) == 'gpt-4.1-nano'
+
+
+def test_baja_de_modelo_cuando_el_costo_no_alcanza():
+    # Sin reserva: el resumen solo alcanza para mini
+    enrutador = ER.EnrutadorModelos(PRECIOS, tope_usd=costo('gpt-4.1-mini') * 1.5, reserva_resumen=0.0)
+    assert enrutador.elegir('resumen', PROMPT, 1000) == 'gpt-4.1-mini'
+
+    enrutador.registrar('gpt-4.1-mini', 1.0, costo('gpt-4.1-mini'))
+    assert enrutador.elegir('resumen', PROMPT, 1000) == 'gpt-4.1-nano'
+
+
+def test_baja_de_modelo_cuando_la_latencia_no_entra_en_el_plazo():
+    enrutador = ER.EnrutadorModelos(PRECIOS, plazo_s=100, reserva_resumen=0.0)
+    enrutador.registrar('gpt-4.1', 500.0, 0.0)
+    enrutador.registrar('gpt-4.1-mini', 2.0, 0.0)
+    assert enrutador.elegir('resumen', PROMPT, 1000) == 'gpt-4.1-mini'
+
+
+def test_la_reserva_de_resumen_no_la_usan_las_preguntas():
+    tope = costo('gpt-4.1') * 1.2
+    enrutador = ER.EnrutadorModelos(PRECIOS, tope_usd=tope, reserva_resumen=0.9)
+
+    # Las preguntas solo disponen del 10% del tope
+    assert enrutador.costo_restante('pregunta') == pytest.approx(tope * 0.1)
+    enrutador.registrar('gpt-4.1-nano', 1.0, tope * 0.1)
+    assert enrutador.elegir('pregunta', PROMPT, 1000) is None
+
+    # El resumen todavía tiene la reserva completa
+    assert enrutador.elegir('resumen', PROMPT, 1000) == 'gpt-4.1'
+
+
+def test_reserva_de_tiempo_y_limite_de_la_llamada():
+    enrutador = ER.EnrutadorModelos(PRECIOS, plazo_s=1000, reserva_resumen=0.5)
+    assert enrutador.tiempo_restante('pregunta') == pytest.approx(500, abs=1)
+    assert enrutador.tiempo_restante('resumen') == pytest.approx(1000, abs=1)
+    assert enrutador.limite_llamada('pregunta') == ER.TIMEOUT_LLAMADA_S
+
+    vencido = ER.EnrutadorModelos(PRECIOS, plazo_s=0)
+    assert vencido.limite_llamada('resumen') == 0.0
+
+
+def test_respaldo_cuando_se_agota_el_presupuesto():
+    enrutador = ER.EnrutadorModelos(PRECIOS, tope_usd=0.01, reserva_resumen=0.0)
+    enrutador.registrar('gpt-4.1', 3.0, 0.01)
+
+    assert enrutador.elegir('resumen', PROMPT, 1000) is None
+    assert enrutador.elegir('pregunta', PROMPT, 1000) is None
+
+    resumen = enrutador.resumen()
+    assert resumen['respaldos'] == 2
+    assert resumen['costo_usd'] == pytest.approx(0.01)
+
+
+def test_latencia_promedio_movil_y_modelos_sin_observar():
+    enrutador = ER.EnrutadorModelos(PRECIOS, suavizado=0.5)
+    assert enrutador.estimar_latencia('gpt-4.1') == ER.LATENCIA_INICIAL_S
+
+    enrutador.registrar('gpt-4.1-nano', 2.0, 0.0)
+    enrutador.registrar('gpt-4.1-nano', 4.0, 0.0)
+    assert enrutador.estimar_latencia('gpt-4.1-nano') == pytest.approx(3.0)
+    # Un modelo sin observar se estima con la peor latencia observada
+    assert enrutador.estimar_latencia('gpt-4.1') == pytest.approx(3.0)
+
+
+def test_errores_de_configuracion():
+    with pytest.raises(ValueError):
+        ER.EnrutadorModelos(PRECIOS, modelos_por_tipo={'resumen': ['modelo-sin-precio']})
+    with pytest.raises(ValueError):
+        ER.EnrutadorModelos(PRECIOS).elegir('otro', PROMPT, 100)
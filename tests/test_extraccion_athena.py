@@ -0,0 +1,126 @@
+"""Pruebas de extraccion_athena contra S3 y Athena simulados con moto."""
+
+import io
+
+import boto3
+import pandas as pd
+import pytest
+from moto import mock_aws
+
+import extraccion_athena as EA
+
+BUCKET = 'bucket-resultados-athena'
+PREFIJO = 'python_ale/prueba/'
+
+
+class AthenaConEstados:
+    """Cliente de Athena de moto que devuelve una secuencia de estados (o una excepción) en get_query_execution."""
+
+    def __init__(self, cliente, estados):
+        self.cliente = cliente
+        self.estados = list(estados)
+        self.detenidas = []
+
+    def __getattr__(self, nombre):
+        return getattr(self.cliente, nombre)
+
+    def get_query_execution(self, **kwargs):
+        estado = self.estados.pop(0) if len(self.estados) > 1 else self.estados[0]
+        if isinstance(estado, BaseException):
+            raise estado
+        respuesta = self.cliente.get_query_execution(**kwargs)
+        respuesta['QueryExecution']['Status']['State'] = estado
+        return respuesta
+
+    def stop_query_execution(self, **kwargs):
+        self.detenidas.append(kwargs['QueryExecutionId'])
+        return self.cliente.stop_query_execution(**kwargs)
+
+
+@pytest.fixture
+def clientes(monkeypatch):
+    for variable in ('AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY', 'AWS_SESSION_TOKEN'):
+        monkeypatch.setenv(variable, 'prueba')
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+
+    with mock_aws():
+        s3 = boto3.client('s3', region_name='us-east-1')
+        s3.create_bucket(Bucket=BUCKET)
+        yield boto3.client('athena', region_name='us-east-1'), s3
+
+
+def contar_llamadas(cliente, operacion):
+    llamadas = []
+    cliente.meta.events.register(f'before-call.s3.{operacion}', lambda **kwargs: llamadas.append(1))
+    return llamadas
+
+
+def subir_partes(s3, partes=5, metadatos=1500):
+    """Simula la salida de UNLOAD: partes Parquet en datos/ y archivos de Athena en meta/."""
+    for i in range(partes):
+        buffer = io.BytesIO()
+        pd.DataFrame({'student_id': [i * 10, i * 10 + 1], 'answer': ['a', 'b']}).to_parquet(buffer)
+        s3.put_object(Bucket=BUCKET, Key=f'{PREFIJO}datos/parte-{i:03d}.parquet', Body=buffer.getvalue())
+    for i in range(metadatos):
+        s3.put_object(Bucket=BUCKET, Key=f'{PREFIJO}meta/{i:05d}.metadata', Body=b'')
+
+
+def claves_restantes(s3):
+    return EA.listar_claves(s3, BUCKET, '')
+
+
+def test_listar_claves_recorre_todas_las_paginas(clientes):
+    _, s3 = clientes
+    for i in range(1500):
+        s3.put_object(Bucket=BUCKET, Key=f'{PREFIJO}{i:05d}', Body=b'')
+    listados = contar_llamadas(s3, 'ListObjectsV2')
+
+    assert len(EA.listar_claves(s3, BUCKET, PREFIJO)) == 1500
+    assert len(listados) == 2
+
+
+def test_extraer_unload_descarga_partes_y_borra_el_prefijo(clientes):
+    athena, s3 = clientes
+    subir_partes(s3)
+    s3.put_object(Bucket=BUCKET, Key='otra_carpeta/no_borrar', Body=b'')
+    borrados = contar_llamadas(s3, 'DeleteObjects')
+
+    df = EA.extraer_unload('SELECT 1', BUCKET, PREFIJO, athena=athena, s3=s3, max_workers=4, intervalo=0)
+
+    assert len(df) == 10
+    assert df['student_id'].tolist() == sorted(df['student_id'])  # Partes concatenadas en orden
+    assert len(borrados) == 2  # 1505 claves en lotes de 1000
+    assert claves_restantes(s3) == ['otra_carpeta/no_borrar']
+
+
+def test_extraer_unload_borra_el_prefijo_si_la_consulta_falla(clientes):
+    athena, s3 = clientes
+    subir_partes(s3, partes=2, metadatos=10)  # Salida parcial de una consulta fallida
+    athena_fallida = AthenaConEstados(athena, ['RUNNING', 'FAILED'])
+
+    with pytest.raises(RuntimeError, match='FAILED'):
+        EA.extraer_unload('SELECT 1', BUCKET, PREFIJO, athena=athena_fallida, s3=s3, intervalo=0)
+
+    assert athena_fallida.detenidas == []  # Ya estaba en un estado final
+    assert claves_restantes(s3) == []
+
+
+def test_extraer_unload_detiene_la_consulta_antes_de_borrar_si_se_interrumpe(clientes):
+    athena, s3 = clientes
+    subir_partes(s3, partes=2, metadatos=10)
+    athena_interrumpida = AthenaConEstados(athena, [KeyboardInterrupt(), 'RUNNING', 'CANCELLED'])
+    claves_al_detener = []
+    detener = athena_interrumpida.stop_query_execution
+
+    def detener_y_registrar(**kwargs):
+        claves_al_detener.append(len(claves_restantes(s3)))
+        return detener(**kwargs)
+
+    athena_interrumpida.stop_query_execution = detener_y_registrar
+
+    with pytest.raises(KeyboardInterrupt):
+        EA.extraer_unload('SELECT 1', BUCKET, PREFIJO, athena=athena_interrumpida, s3=s3, intervalo=0)
+
+    assert len(athena_interrumpida.detenidas) == 1
+    assert claves_al_detener == [12]  # Se detuvo antes de borrar
+    assert claves_restantes(s3) == []
@@ -0,0 +1,85 @@
+"""Pruebas del índice de tags y de los matches confirmados."""
+
+import pandas as pd
+import pytest
+
+import mapeo_tags as MT
+
+PREGUNTAS_CATALOGO = ['¿Cuál es tu edad?', '¿Con qué género te identificas?', '¿En qué comuna vives?']
+
+
+@pytest.fixture
+def catalogo():
+    return pd.DataFrame({
+        '# final': [1, 2, 3],
+        'seccion': ['Datos', 'Datos', 'Datos'],
+        'tag': ['edad', 'genero', 'comuna'],
+        'dimension': ['Demografía'] * 3,
+        'Pregunta final': PREGUNTAS_CATALOGO,
+    })
+
+
+@pytest.fixture
+def ruta(tmp_path):
+    return str(tmp_path / 'confirmados.csv')
+
+
+def test_match_elige_la_pregunta_mas_parecida(catalogo):
+    indice = MT.IndiceTags(catalogo, ruta_confirmados=None)
+    matches = indice.match(['cual es tu edad', '¿Con que genero te identificas?', 'Pregunta sin relación', 'cual es tu edad'])
+
+    assert len(matches) == 3  # Las preguntas repetidas se comparan una vez
+    resultado = dict(zip(matches['question'], matches['question_match']))
+    assert resultado['cual es tu edad'] == '¿Cuál es tu edad?'
+    assert resultado['¿Con que genero te identificas?'] == '¿Con qué género te identificas?'
+    assert pd.isna(resultado['Pregunta sin relación'])
+    assert matches['similitud'].between(0, 1).all()
+
+
+def test_al_recargar_se_vuelve_a_aplicar_el_cutoff(catalogo, ruta):
+    indice = MT.IndiceTags(catalogo, cutoff=0.3, ruta_confirmados=ruta)
+    matches = indice.match(['cual es tu edad', 'comuna donde vives'])
+    indice.confirmar(matches)
+    similitud = dict(zip(matches['question'], matches['similitud']))
+    assert 0.3 <= similitud['comuna donde vives'] < 0.9
+
+    # Con un cutoff más exigente el match débil se descarta y se recalcula
+    exigente = MT.IndiceTags(catalogo, cutoff=0.9, ruta_confirmados=ruta)
+    assert 'comuna donde vives' not in exigente.confirmados
+    assert pd.isna(exigente.match(['comuna donde vives'])['question_match'].iloc[0])
+
+    # Los matches que ya no están en el catálogo también se descartan
+    reducido = MT.IndiceTags(catalogo[catalogo['tag'] != 'edad'], cutoff=0.3, ruta_confirmados=ruta)
+    assert 'cual es tu edad' not in reducido.confirmados
+
+
+def test_manual_se_conserva_sobre_el_cutoff_y_los_automaticos(catalogo, ruta):
+    indice = MT.IndiceTags(catalogo, ruta_confirmados=ruta)
+    manual = pd.DataFrame({'question': ['Edad en años'], 'question_match': ['¿Cuál es tu edad?'], 'similitud': [0.2]})
+    indice.confirmar(manual, manual=True)
+
+    automatico = pd.DataFrame({'question': ['Edad en años'], 'question_match': ['¿En qué comuna vives?'], 'similitud': [0.95]})
+    indice.confirmar(automatico)
+
+    recargado = MT.IndiceTags(catalogo, cutoff=0.9, ruta_confirmados=ruta)
+    assert recargado.confirmados['Edad en años'] == ('¿Cuál es tu edad?', 0.2, True)
+
+
+def test_un_indice_antiguo_no_borra_matches_de_otros_procesos(catalogo, ruta):
+    # Índice cacheado en un proceso de larga vida, construido antes que los demás matches
+    antiguo = MT.IndiceTags(catalogo, ruta_confirmados=ruta)
+
+    otro = MT.IndiceTags(catalogo, ruta_confirmados=ruta)
+    otro.confirmar(pd.DataFrame({'question': ['Edad en años'], 'question_match': ['¿Cuál es tu edad?'], 'similitud': [0.2]}),
+                   manual=True)
+    # Un match guardado con otro cutoff tampoco se pierde al reescribir
+    MT.IndiceTags(catalogo, cutoff=0.1, ruta_confirmados=ruta).confirmar(
+        pd.DataFrame({'question': ['Comuna'], 'question_match': ['¿En qué comuna vives?'], 'similitud': [0.15]}))
+
+    antiguo.confirmar(antiguo.match(['cual es tu edad', 'Edad en años']))
+
+    guardados = pd.read_csv(ruta).set_index('question')
+    assert set(guardados.index) == {'cual es tu edad', 'Edad en años', 'Comuna'}
+    assert bool(guardados.loc['Edad en años', 'manual'])
+    # El índice antiguo usó la confirmación manual en lugar de recalcular
+    assert antiguo.match(['Edad en años'])['question_match'].iloc[0] == '¿Cuál es tu edad?'
@@ -0,0 +1,88 @@
+"""Pruebas de las llamadas con plazo: reintentos y texto de respaldo ante errores de la API."""
+
+import os
+from types import SimpleNamespace
+
+import openai
+import pytest
+
+os.environ.setdefault('OPENAI_API_KEY', 'clave-de-prueba')
+
+import enrutador_modelos as ER  # noqa: E402
+import openIA_analisis_conclusiones as OA  # noqa: E402
+
+
+
+def error_api(clase, estado):
+    """Error de estado HTTP de la API sin hacer la solicitud (solo usa status_code, headers y request)."""
+    return clase(f"HTTP {estado}", response=SimpleNamespace(status_code=estado, headers={}, request=None), body=None)
+
+
+def error_limite():
+    return error_api(openai.RateLimitError, 429)
+
+
+def error_servidor():
+    return error_api(openai.InternalServerError, 502)
+
+
+def respuesta(texto):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=texto))],
+                           usage=SimpleNamespace(prompt_tokens=100, completion_tokens=20))
+
+
+@pytest.fixture
+def cliente(monkeypatch):
+    """Cliente falso que devuelve (o lanza) los resultados en orden y registra los timeouts."""
+    falso = SimpleNamespace(resultados=[], timeouts=[])
+
+    def create(timeout, **kwargs):
+        falso.timeouts.append(timeout)
+        resultado = falso.resultados.pop(0)
+        if isinstance(resultado, Exception):
+            raise resultado
+        return resultado
+
+    falso.chat = SimpleNamespace(completions=SimpleNamespace(create=create))
+    monkeypatch.setattr(OA, '_cliente_sin_reintentos', falso)
+    monkeypatch.setattr(OA.time, 'sleep', lambda segundos: None)
+    return falso
+
+
+@pytest.fixture
+def enrutador():
+    return ER.EnrutadorModelos(OA.PRECIOS_MODELOS)
+
+
+def test_reintenta_errores_transitorios_dentro_del_plazo(cliente, enrutador):
+    cliente.resultados = [error_limite(), error_servidor(), respuesta('análisis')]
+
+    texto = OA.llamar_modelo('prompt', 'pregunta', 100, enrutador=enrutador, respaldo='respaldo')
+
+    assert texto == 'análisis'
+    assert len(cliente.timeouts) == 3
+    assert all(0 < t <= ER.TIMEOUT_LLAMADA_S for t in cliente.timeouts)
+
+
+def test_error_persistente_usa_el_respaldo_y_registra_la_demora(cliente, enrutador):
+    cliente.resultados = [error_limite()] * (OA.REINTENTOS + 1)
+
+    texto = OA.llamar_modelo('prompt', 'pregunta', 100, enrutador=enrutador, respaldo='respaldo')
+
+    assert texto == 'respaldo'
+    assert 'gpt-4.1-nano' in enrutador.latencias
+    assert enrutador.costo_acumulado == 0.0
+
+
+def test_error_no_transitorio_no_se_reintenta(cliente, enrutador):
+    cliente.resultados = [error_api(openai.BadRequestError, 400)]
+
+    assert OA.llamar_modelo('prompt', 'pregunta', 100, enrutador=enrutador, respaldo='respaldo') == 'respaldo'
+    assert len(cliente.timeouts) == 1
+
+
+def test_sin_plazo_para_esperar_no_se_reintenta(cliente):
+    cliente.resultados = [error_limite()]
+
+    assert OA.call_gpt('prompt', timeout=0.1, respaldo='respaldo') == 'respaldo'
+    assert len(cliente.timeouts) == 1
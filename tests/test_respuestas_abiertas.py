@@ -0,0 +1,61 @@
+"""Pruebas de la agrupación en temas de las respuestas abiertas."""
+
+import pandas as pd
+import pytest
+
+import respuestas_abiertas as RA
+
+TEMAS = {
+    'familia': ['ayudar a mi familia', 'apoyar a mi familia', 'cuidar a mi familia'],
+    'medicina': ['estudiar medicina', 'ser doctora en medicina', 'medicina en la universidad'],
+    'profesor': ['ser profesor', 'profesor de historia', 'trabajar como profesor'],
+    'futbol': ['jugar futbol profesional', 'futbol en un club', 'entrenador de futbol'],
+    'programacion': ['aprender programacion', 'programacion de videojuegos', 'programacion web'],
+    'musica': ['tocar guitarra en una banda', 'musica y guitarra', 'producir musica'],
+    'viajar': ['viajar por el mundo', 'viajar a europa', 'conocer paises y viajar'],
+    'negocio': ['tener mi propio negocio', 'emprender un negocio', 'negocio de comida'],
+}
+
+
+def respuestas(textos):
+    return pd.DataFrame({'answer': textos, 'tipo_test': ['Cuestionario de salida'] * len(textos)})
+
+
+def test_respuestas_sin_contenido_no_inflan_un_tema():
+    # 8 temas x 30 respuestas y 270 respuestas sin términos
+    textos = [ejemplos[i % 3] for ejemplos in TEMAS.values() for i in range(30)]
+    textos += ['nada', 'no sé', '.'] * 90
+
+    tabla, temas = RA.agrupar_respuestas(respuestas(textos))
+
+    sin_contenido = temas[-1]
+    assert sin_contenido['tema'] == RA.ETIQUETA_SIN_CONTENIDO
+    assert sin_contenido['respuestas'] == 270
+    assert sin_contenido['porcentaje'] == pytest.approx(52.9)
+
+    # Los temas reales solo reparten las 240 respuestas con términos
+    reales = temas[:-1]
+    assert sum(t['respuestas'] for t in reales) == 240
+    assert not {'nada', 'no sé', '.'} & {e for t in reales for e in t['ejemplos']}
+
+    assert tabla['Tema'].iloc[-1] == RA.ETIQUETA_SIN_CONTENIDO
+    assert tabla['Cuestionario de salida'].sum() == 510
+
+    resumen = RA.resumen_temas(temas)
+    assert RA.ETIQUETA_SIN_CONTENIDO not in resumen.split('.')[1]
+    assert '52.9% de las respuestas no tuvo contenido' in resumen
+
+
+@pytest.mark.parametrize('textos, esperados', [
+    (['ayudar a mi familia'] * 6, 1),  # Un solo texto distinto
+    (['ayudar a mi familia', 'estudiar medicina', 'ser profesor', 'jugar futbol', 'viajar por el mundo'], 2),
+    ([t for ejemplos in TEMAS.values() for t in ejemplos], 3),  # 24 distintos: round(sqrt(12))
+])
+def test_cantidad_de_temas_en_entradas_pequenas(textos, esperados):
+    _, temas = RA.agrupar_respuestas(respuestas(textos))
+    assert len(temas) == esperados
+
+
+def test_sin_respuestas_suficientes_o_sin_vocabulario():
+    assert RA.agrupar_respuestas(respuestas(['ser profesor'] * 4))[1] == []
+    assert RA.agrupar_respuestas(respuestas(['nada', 'no sé', '.'] * 3))[1] == []
@@ -0,0 +1,91 @@
+"""Pruebas de significancia: la prueba y las tablas del notebook usan la misma base de porcentajes."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ejecutor_notebook as EN
+import significancia as SG
+
+FUNCIONES_NOTEBOOK = ('def ordenar_tipo_test', 'def tabla_answer', 'def tabla_agrupada', 'def tabla_agrupada_top')
+
+
+@pytest.fixture(scope='module')
+def notebook():
+    """Funciones del notebook (ordenar_tipo_test, tablas de respuestas y de mapas de calor) ejecutadas sobre pd, np y SG."""
+    espacio = {'pd': pd, 'np': np, 'SG': SG}
+    for celda in EN.cargar_celdas():
+        if any(funcion in celda['codigo'] for funcion in FUNCIONES_NOTEBOOK):
+            exec(compile(celda['codigo'], f"celda_{celda['indice']}", 'exec'), espacio)
+    return espacio
+
+
+@pytest.fixture
+def respuestas():
+    """Pregunta de multiselección (cada estudiante elige una o varias opciones) en dos tests y dos grados."""
+    rng = np.random.default_rng(7)
+    opciones = ['Lectura', 'Deporte', 'Música', 'Videojuegos']
+    filas = []
+    for test, probabilidades in (('Cuestionario medio', [0.3, 0.5, 0.4, 0.6]),
+                                 ('Cuestionario de salida', [0.7, 0.5, 0.2, 0.6])):
+        for estudiante in range(200):
+            elegidas = [o for o, p in zip(opciones, probabilidades) if rng.random() < p] or ['Lectura']
+            for opcion in elegidas:
+                filas.append({'student_id': estudiante, 'grade': f"{estudiante % 2 + 1}° medio",
+                              'question': '¿Qué haces en tu tiempo libre?', 'tipo_test': test, 'answer': opcion})
+    return pd.DataFrame(filas)
+
+
+def test_proporciones_cuenta_estudiantes_no_filas(respuestas):
+    tabla = SG.proporciones(respuestas)
+
+    base = respuestas.groupby('tipo_test')['student_id'].nunique()
+    assert (tabla['base'] == tabla['tipo_test'].map(base)).all()
+    # En multiselección los porcentajes de un test suman más de 100%
+    assert (tabla.groupby('tipo_test')['porcentaje'].sum() > 1).all()
+
+
+def test_tabla_answer_coincide_con_la_prueba(respuestas, notebook):
+    tests = ['Cuestionario medio', 'Cuestionario de salida']
+    resultado = SG.comparar_tests(respuestas, tests)
+    tabla = notebook['tabla_answer'](respuestas, SG.respuestas_significativas(resultado, respuestas['question'][0]))
+
+    # Columnas en orden cronológico aunque alfabéticamente "de salida" va antes que "medio"
+    assert list(tabla.columns[1:3]) == [f"% {t}" for t in tests]
+
+    diferencias = tabla.set_index('Respuesta')['Diferencia (pp)'].str.removesuffix(' pp').astype(float)
+    esperado = resultado.set_index('answer')['diferencia_pp'].round(1)
+    pd.testing.assert_series_equal(diferencias.sort_index(), esperado.sort_index(), check_names=False)
+
+    porcentajes = tabla.set_index('Respuesta')[f"% {tests[1]}"].str.removesuffix(' %').astype(float)
+    assert np.allclose(porcentajes.sort_index(), resultado.set_index('answer')['porcentaje_2'].round(1).sort_index())
+
+    marcadas = set(tabla.loc[tabla['Cambio significativo'] == 'Sí', 'Respuesta'])
+    assert marcadas == set(resultado.loc[resultado['significativo'], 'answer'])
+    assert marcadas  # Lectura sube de ~30% a ~70%
+
+
+def test_tabla_agrupada_coincide_con_la_prueba_por_dimension(respuestas, notebook):
+    tests = ['Cuestionario medio', 'Cuestionario de salida']
+    resultado = SG.comparar_tests(respuestas, tests, claves=['question', 'grade'])
+    tabla = notebook['tabla_agrupada'](respuestas, 'grade').set_index('grade')
+
+    esperado = resultado.pivot(index='grade', columns='answer', values='diferencia_pp') / 100
+    assert np.allclose(tabla[esperado.columns].loc[esperado.index], esperado)
+
+
+def test_otros_conserva_los_valores_con_un_solo_test(respuestas, notebook):
+    # Dos grados con ambos tests y dos grupos chicos que solo respondieron la salida
+    salida = respuestas[respuestas['tipo_test'] == 'Cuestionario de salida']
+    chicos = pd.concat([
+        salida[salida['student_id'] < 10].assign(grade='Sin grado A'),
+        salida[salida['student_id'].between(10, 19)].assign(grade='Sin grado B'),
+    ])
+    datos = pd.concat([respuestas, chicos], ignore_index=True)
+
+    tabla = notebook['tabla_agrupada_top'](datos, 'grade', top_n=2).set_index('grade')
+
+    assert list(tabla.index) == ['1° medio', '2° medio', notebook['ETIQUETA_OTROS']]
+    # El test que falta cuenta como 0: la variación es el porcentaje de la salida
+    esperado = SG.proporciones(chicos).set_index('answer')['porcentaje']
+    assert np.allclose(tabla.loc[notebook['ETIQUETA_OTROS'], esperado.index], esperado)